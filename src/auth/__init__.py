@@ -5,7 +5,13 @@ Authentication Module
 """
 
 from .cookies import CookieManager
-from .login import AutoLogin
 
 __all__ = ["CookieManager", "AutoLogin"]
 
+
+def __getattr__(name: str):
+    # استيراد كسول: AutoLogin يحتاج Playwright
+    if name == "AutoLogin":
+        from .login import AutoLogin
+        return AutoLogin
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
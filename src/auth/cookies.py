@@ -10,9 +10,8 @@ from typing import Optional
 from http.cookiejar import MozillaCookieJar, Cookie
 from datetime import datetime
 
-from rich.console import Console
-
-console = Console()
+from ..log import console
+from ..config import AUTH_VERBOSE
 
 
 class CookieManager:
@@ -25,21 +24,33 @@ class CookieManager:
     """
     
     # Cookies المطلوبة للمصادقة
-    AUTH_COOKIES = [
+    AUTH_COOKIES = frozenset({
         "auth0.u0ERZlg3gng09tmcfxmz3YesyFWWmloM.is.authenticated",
         "_legacy_auth0.u0ERZlg3gng09tmcfxmz3YesyFWWmloM.is.authenticated"
-    ]
+    })
+    
+    _HTTPONLY_PREFIX = "#HttpOnly_"
     
-    def __init__(self, cookies_file: Path):
+    def __init__(self, cookies_file: Path, verbose: bool = AUTH_VERBOSE):
         """
         تهيئة مدير الـ Cookies
         
         Args:
             cookies_file: مسار ملف الـ cookies
+            verbose: طباعة رسائل النجاح والتفاصيل (افتراضياً من AUTH_VERBOSE)
         """
-        self.cookies_file = Path(cookies_file)
+        self.cookies_file = cookies_file if isinstance(cookies_file, Path) else Path(cookies_file)
+        self._parent = self.cookies_file.parent
+        # إنشاء المجلد مرة واحدة فقط طوال عمر الكائن
+        self._parent_ready = False
+        self.verbose = verbose
         self.cookie_jar = MozillaCookieJar()
         self._cookies_dict: dict = {}
+        # فهرس الاسم → Cookie للوصول المباشر عند التحقق من الانتهاء
+        self._cookie_index: dict[str, Cookie] = {}
+        # cookies المصادقة الموجودة بقيمة "true" (تُحسب عند التحميل)
+        self._active_auth_cookies: set[str] = set()
+        self._now: int = 0
         
     def load(self) -> bool:
         """
@@ -53,25 +64,65 @@ class CookieManager:
             return False
             
         try:
-            self.cookie_jar.load(
-                str(self.cookies_file),
-                ignore_discard=True,
-                ignore_expires=True
-            )
+            self._fast_load()
             
-            # تحويل إلى قاموس للوصول السهل
-            self._cookies_dict = {
-                cookie.name: cookie.value 
-                for cookie in self.cookie_jar
-            }
-            
-            console.print(f"[green]✓ تم تحميل {len(self._cookies_dict)} cookie[/green]")
+            if self.verbose:
+                console.print(f"[green]✓ تم تحميل {len(self._cookies_dict)} cookie[/green]")
             return True
             
         except Exception as e:
             console.print(f"[red]✗ خطأ في تحميل الـ cookies: {e}[/red]")
             return False
     
+    def _fast_load(self) -> None:
+        """
+        قراءة ملف Netscape مباشرة (بديل أسرع لـ MozillaCookieJar.load)
+        
+        يبني الـ Cookie ويحدّث القاموس والفهرس في نفس المرور
+        (ما يعادل ignore_discard=True و ignore_expires=True)
+        """
+        for line in self.cookies_file.read_text(encoding="utf-8").splitlines():
+            rest = {}
+            
+            # cookies الـ HttpOnly تُكتب مع البادئة "#HttpOnly_"
+            if line.startswith(self._HTTPONLY_PREFIX):
+                rest["HTTPOnly"] = ""
+                line = line[len(self._HTTPONLY_PREFIX):]
+            
+            stripped = line.strip()
+            if not stripped or stripped.startswith(("#", "$")):
+                continue
+            
+            domain, domain_specified, path, secure, expires, name, value = line.split("\t")
+            if name == "":
+                # نفس سلوك MozillaCookieJar مع 'Set-Cookie: foo'
+                name, value = value, None
+            
+            cookie = Cookie(
+                version=0,
+                name=name,
+                value=value,
+                port=None,
+                port_specified=False,
+                domain=domain,
+                domain_specified=domain_specified == "TRUE",
+                domain_initial_dot=domain.startswith("."),
+                path=path,
+                path_specified=False,
+                secure=secure == "TRUE",
+                expires=expires or None,
+                discard=expires == "",
+                comment=None,
+                comment_url=None,
+                rest=rest
+            )
+            
+            self.cookie_jar.set_cookie(cookie)
+            self._cookies_dict[cookie.name] = cookie.value
+            self._cookie_index[cookie.name] = cookie
+        
+        self._refresh_active_auth()
+    
     def save(self) -> bool:
         """
         حفظ الـ cookies إلى الملف
@@ -81,7 +132,9 @@ class CookieManager:
         """
         try:
             # التأكد من وجود المجلد
-            self.cookies_file.parent.mkdir(parents=True, exist_ok=True)
+            if not self._parent_ready:
+                self._parent.mkdir(parents=True, exist_ok=True)
+                self._parent_ready = True
             
             self.cookie_jar.save(
                 str(self.cookies_file),
@@ -89,7 +142,8 @@ class CookieManager:
                 ignore_expires=True
             )
             
-            console.print(f"[green]✓ تم حفظ الـ cookies[/green]")
+            if self.verbose:
+                console.print(f"[green]✓ تم حفظ الـ cookies[/green]")
             return True
             
         except Exception as e:
@@ -105,16 +159,17 @@ class CookieManager:
         """
         if not self._cookies_dict:
             return False
+        
+        # وقت واحد لكل عملية تحقق بدلاً من time.time() لكل cookie
+        self._now = int(time.time())
             
-        # التحقق من وجود cookies المصادقة
-        for auth_cookie in self.AUTH_COOKIES:
-            if auth_cookie in self._cookies_dict:
-                value = self._cookies_dict[auth_cookie]
-                if value.lower() == "true":
-                    # التحقق من تاريخ الانتهاء
-                    if self._check_expiry(auth_cookie):
-                        console.print("[green]✓ الجلسة صالحة[/green]")
-                        return True
+        # التحقق من cookies المصادقة المفعّلة فقط
+        for auth_cookie in self._active_auth_cookies:
+            # التحقق من تاريخ الانتهاء
+            if self._check_expiry(auth_cookie):
+                if self.verbose:
+                    console.print("[green]✓ الجلسة صالحة[/green]")
+                return True
         
         console.print("[yellow]⚠ الجلسة منتهية أو غير صالحة[/yellow]")
         return False
@@ -129,20 +184,22 @@ class CookieManager:
         Returns:
             True إذا لم تنتهِ صلاحيته
         """
-        for cookie in self.cookie_jar:
-            if cookie.name == cookie_name:
-                if cookie.expires is None or cookie.expires == 0:
-                    # Session cookie - صالح
-                    return True
-                    
-                # التحقق من الوقت
-                current_time = int(time.time())
-                if cookie.expires > current_time:
-                    expires_dt = datetime.fromtimestamp(cookie.expires)
-                    console.print(f"[dim]  ⏱ ينتهي في: {expires_dt}[/dim]")
-                    return True
-                    
-        return False
+        cookie = self._cookie_index.get(cookie_name)
+        if cookie is None:
+            return False
+            
+        if cookie.expires is None or cookie.expires == 0:
+            # Session cookie - صالح
+            return True
+            
+        # التحقق من الوقت (مقارنة أعداد صحيحة فقط)
+        if cookie.expires <= self._now:
+            return False
+            
+        if self.verbose:
+            expires_dt = datetime.fromtimestamp(cookie.expires)
+            console.print(f"[dim]  ⏱ ينتهي في: {expires_dt}[/dim]")
+        return True
     
     def get_cookies_for_playwright(self) -> list[dict]:
         """
@@ -151,33 +208,23 @@ class CookieManager:
         Returns:
             قائمة cookies بتنسيق Playwright
         """
-        playwright_cookies = []
-        
-        for cookie in self.cookie_jar:
-            # تنظيف domain
-            domain = cookie.domain
-            if domain and not domain.startswith('.'):
-                domain = '.' + domain
-            
-            playwright_cookie = {
-                "name": cookie.name,
-                "value": cookie.value,
-                "domain": domain,
-                "path": cookie.path or "/",
-                "secure": cookie.secure,
+        # بناء القائمة في مرور واحد (تنظيف domain + تاريخ الانتهاء إذا موجود)
+        playwright_cookies = [
+            {
+                "name": c.name,
+                "value": c.value,
+                "domain": c.domain if not c.domain or c.domain.startswith('.') else '.' + c.domain,
+                "path": c.path or "/",
+                "secure": c.secure,
                 "httpOnly": False,
+                "sameSite": "Lax",
+                **({"expires": float(c.expires)} if c.expires and c.expires > 0 else {}),
             }
-            
-            # إضافة تاريخ الانتهاء إذا موجود
-            if cookie.expires and cookie.expires > 0:
-                playwright_cookie["expires"] = float(cookie.expires)
-            
-            # إضافة sameSite
-            playwright_cookie["sameSite"] = "Lax"
-                
-            playwright_cookies.append(playwright_cookie)
+            for c in self.cookie_jar
+        ]
         
-        console.print(f"[dim]  تم تحويل {len(playwright_cookies)} cookie لـ Playwright[/dim]")
+        if self.verbose:
+            console.print(f"[dim]  تم تحويل {len(playwright_cookies)} cookie لـ Playwright[/dim]")
             
         return playwright_cookies
     
@@ -211,13 +258,21 @@ class CookieManager:
             
             self.cookie_jar.set_cookie(cookie)
             
-        # تحديث القاموس
-        self._cookies_dict = {
-            cookie.name: cookie.value 
-            for cookie in self.cookie_jar
-        }
+            # تحديث القاموس والفهرس في نفس المرور
+            self._cookies_dict[cookie.name] = cookie.value
+            self._cookie_index[cookie.name] = cookie
+            
+        self._refresh_active_auth()
         
-        console.print(f"[green]✓ تم تحديث {len(cookies)} cookie[/green]")
+        if self.verbose:
+            console.print(f"[green]✓ تم تحديث {len(cookies)} cookie[/green]")
+    
+    def _refresh_active_auth(self) -> None:
+        """تحديد cookies المصادقة التي قيمتها "true" """
+        self._active_auth_cookies = {
+            name for name in self._cookies_dict.keys() & self.AUTH_COOKIES
+            if (self._cookies_dict[name] or "").lower() == "true"
+        }
     
     def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
         """
@@ -236,6 +291,8 @@ class CookieManager:
         """مسح جميع الـ cookies"""
         self.cookie_jar.clear()
         self._cookies_dict.clear()
+        self._cookie_index.clear()
+        self._active_auth_cookies.clear()
         console.print("[yellow]⚠ تم مسح جميع الـ cookies[/yellow]")
     
     def __len__(self) -> int:
@@ -6,12 +6,13 @@ Auto Login Module
 
 import asyncio
 import random
+import re
 from typing import Optional
 from pathlib import Path
 
 from playwright.async_api import async_playwright, Page, Browser
-from rich.console import Console
 
+from ..log import console
 from .cookies import CookieManager
 from ..config import (
     CARFAX_EMAIL,
@@ -24,13 +25,24 @@ from ..config import (
     USER_AGENT,
     PROXY_ENABLED,
     USE_CHROME_PROFILE,
-    CHROME_USER_DATA_DIR,
-    CHROME_PROFILE,
+    CHROME_PROFILE_DIR,
     validate_credentials,
     get_playwright_proxy
 )
 
-console = Console()
+
+# مؤشرات التسجيل الناجح
+_LOGIN_INDICATORS = (
+    "dealer home",
+    "logged in",
+    "welcome",
+    "logout",
+    "sign out",
+    "my account",
+)
+
+# نمط واحد بدلاً من نسخة lowercase + بحث منفصل لكل مؤشر
+_LOGIN_OK_RE = re.compile("|".join(map(re.escape, _LOGIN_INDICATORS)), re.IGNORECASE)
 
 
 class AutoLogin:
@@ -43,9 +55,9 @@ class AutoLogin:
     
     # CSS Selectors لصفحة تسجيل الدخول
     SELECTORS = {
-        "email_input": 'input[name="username"], input[type="email"], #username',
+        "email_input": 'input[name="username"], input[type="email"], #username, input[name="email"]',
         "password_input": 'input[name="password"], input[type="password"], #password',
-        "submit_button": 'button[type="submit"], button[name="action"], .auth0-lock-submit',
+        "submit_button": 'button[type="submit"], button[name="action"], .auth0-lock-submit, input[type="submit"]',
         "error_message": '.auth0-global-message-error, .error-message, [class*="error"]',
         "logged_in_indicator": '[class*="dealer"], [class*="logged-in"], .user-menu'
     }
@@ -83,9 +95,8 @@ class AutoLogin:
             async with async_playwright() as p:
                 # استخدام Chrome Profile إذا كان مفعل
                 if USE_CHROME_PROFILE:
-                    import os
                     context = await p.chromium.launch_persistent_context(
-                        user_data_dir=os.path.join(CHROME_USER_DATA_DIR, CHROME_PROFILE),
+                        user_data_dir=CHROME_PROFILE_DIR,
                         channel="chrome",
                         headless=False,
                         viewport={"width": 1920, "height": 1080},
@@ -103,30 +114,35 @@ class AutoLogin:
                         headless=HEADLESS,
                         proxy=get_playwright_proxy()
                     )
+                    # تحميل الـ cookies إذا موجودة (مع إنشاء الـ context مباشرة)
+                    storage_state = None
+                    if len(self.cookie_manager) > 0:
+                        storage_state = {
+                            "cookies": self.cookie_manager.get_cookies_for_playwright(),
+                            "origins": []
+                        }
+                    
                     context = await browser.new_context(
                         user_agent=USER_AGENT,
                         viewport={"width": 1920, "height": 1080},
-                        ignore_https_errors=PROXY_ENABLED
+                        ignore_https_errors=PROXY_ENABLED,
+                        storage_state=storage_state
                     )
                     
-                    # تحميل الـ cookies إذا موجودة
-                    cookies = self.cookie_manager.get_cookies_for_playwright()
-                    if cookies:
-                        await context.add_cookies(cookies)
-                    
                     page = await context.new_page()
                 
                 # الخطوة 1: فتح صفحة تسجيل الدخول
                 console.print("[dim]  → فتح صفحة تسجيل الدخول...[/dim]")
                 await page.goto(CARFAX_LOGIN_URL, wait_until="networkidle")
                 
-                # انتظار تحميل الصفحة
-                await asyncio.sleep(2)
-                
                 # الخطوة 2: ملء البيانات والتسجيل
                 console.print("[dim]  → إدخال بيانات الاعتماد...[/dim]")
                 
-                # تأخير عشوائي لمحاكاة السلوك البشري
+                # انتظار ظهور حقل البريد (بدلاً من انتظار ثابت) + تأخير عشوائي لمحاكاة السلوك البشري
+                try:
+                    await page.wait_for_selector(self.SELECTORS["email_input"], state="visible", timeout=10000)
+                except:
+                    pass
                 await asyncio.sleep(random.uniform(1, 2))
                 
                 # دالة مساعدة لإغلاق المتصفح
@@ -155,11 +171,15 @@ class AutoLogin:
                 await asyncio.sleep(random.uniform(0.5, 1))
                 
                 # النقر على زر تسجيل الدخول
+                url_before = page.url
                 await self._click_submit(page)
                 
-                # انتظار التوجيه
+                # انتظار التوجيه (تغيّر الـ URL) بدلاً من انتظار ثابت
                 console.print("[dim]  → انتظار تسجيل الدخول...[/dim]")
-                await asyncio.sleep(5)
+                try:
+                    await page.wait_for_url(lambda url: url != url_before, timeout=15000)
+                except:
+                    pass
                 
                 # الخطوة 3: التحقق من نجاح التسجيل
                 if await self._verify_login(page):
@@ -180,60 +200,38 @@ class AutoLogin:
     
     async def _fill_email(self, page: Page) -> bool:
         """ملء حقل البريد الإلكتروني"""
-        selectors = [
-            'input[name="username"]',
-            'input[type="email"]',
-            '#username',
-            'input[name="email"]'
-        ]
-        
-        for selector in selectors:
-            try:
-                element = await page.query_selector(selector)
-                if element:
-                    await element.fill(CARFAX_EMAIL)
-                    return True
-            except:
-                continue
+        # selector واحد مدمج = طلب واحد للمتصفح بدلاً من طلب لكل بديل
+        try:
+            element = await page.query_selector(self.SELECTORS["email_input"])
+            if element:
+                await element.fill(CARFAX_EMAIL)
+                return True
+        except:
+            pass
                 
         return False
     
     async def _fill_password(self, page: Page) -> bool:
         """ملء حقل كلمة المرور"""
-        selectors = [
-            'input[name="password"]',
-            'input[type="password"]',
-            '#password'
-        ]
-        
-        for selector in selectors:
-            try:
-                element = await page.query_selector(selector)
-                if element:
-                    await element.fill(CARFAX_PASSWORD)
-                    return True
-            except:
-                continue
+        try:
+            element = await page.query_selector(self.SELECTORS["password_input"])
+            if element:
+                await element.fill(CARFAX_PASSWORD)
+                return True
+        except:
+            pass
                 
         return False
     
     async def _click_submit(self, page: Page) -> bool:
         """النقر على زر الإرسال"""
-        selectors = [
-            'button[type="submit"]',
-            'button[name="action"]',
-            '.auth0-lock-submit',
-            'input[type="submit"]'
-        ]
-        
-        for selector in selectors:
-            try:
-                element = await page.query_selector(selector)
-                if element:
-                    await element.click()
-                    return True
-            except:
-                continue
+        try:
+            element = await page.query_selector(self.SELECTORS["submit_button"])
+            if element:
+                await element.click()
+                return True
+        except:
+            pass
         
         # محاولة الضغط على Enter
         try:
@@ -254,30 +252,23 @@ class AutoLogin:
         """
         try:
             # محاولة الوصول للصفحة الرئيسية
+            # networkidle يعني أن الصفحة استقرت - لا حاجة لانتظار إضافي
             await page.goto(CARFAX_BASE_URL, wait_until="networkidle")
-            await asyncio.sleep(2)
+            
+            # المسار السريع: URL خارج صفحة الدخول ولا توجد رسالة خطأ - لا حاجة لتحميل HTML
+            url_ok = "login" not in page.url.lower()
+            if url_ok and not await page.query_selector('.auth0-global-message-error'):
+                return True
             
             # الحصول على محتوى الصفحة
             content = await page.content()
-            html_lower = content.lower()
             
             # مؤشرات التسجيل الناجح
-            logged_in_indicators = [
-                "dealer home",
-                "logged in",
-                "welcome",
-                "logout",
-                "sign out",
-                "my account"
-            ]
-            
-            for indicator in logged_in_indicators:
-                if indicator in html_lower:
-                    return True
+            if _LOGIN_OK_RE.search(content):
+                return True
             
             # التحقق من URL
-            current_url = page.url
-            if "login" not in current_url.lower():
+            if url_ok:
                 return True
             
             return False
@@ -4,16 +4,46 @@ Token Manager Module
 إدارة Access Tokens و Refresh Tokens
 """
 
-import json
+import os
 import time
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import base64
 
-from rich.console import Console
+import orjson
 
-console = Console()
+from ..log import console
+from ..config import AUTH_VERBOSE
+
+
+@lru_cache(maxsize=4)
+def _decode_jwt(token: str) -> Optional[dict]:
+    """
+    فك تشفير payload الـ JWT (النتيجة مخزنة لأن الـ token نادراً ما يتغير)
+    
+    Args:
+        token: الـ JWT
+        
+    Returns:
+        محتوى الـ payload أو None
+    """
+    try:
+        # JWT format: header.payload.signature
+        parts = token.split(".")
+        if len(parts) != 3:
+            return None
+        
+        # فك تشفير الـ payload (إضافة 0-3 أحرف padding حسب الطول)
+        payload = parts[1]
+        decoded = base64.urlsafe_b64decode(
+            (payload + "=" * (-len(payload) % 4)).encode("ascii")
+        )
+        return orjson.loads(decoded)
+        
+    except Exception:
+        return None
 
 
 @dataclass
@@ -26,28 +56,23 @@ class TokenData:
     token_type: str = "Bearer"
     scope: str = "openid profile email offline_access"
     created_at: float = None
+    # وقت الانتهاء المحسوب مسبقاً (قبل 5 دقائق من الانتهاء الفعلي)
+    _deadline: float = field(default=0.0, init=False, repr=False)
     
     def __post_init__(self):
         if self.created_at is None:
             self.created_at = time.time()
+        self._deadline = self.created_at + self.expires_in - 300
     
     @property
     def is_expired(self) -> bool:
         """التحقق من انتهاء صلاحية الـ token"""
-        if self.created_at is None:
-            return True
-        elapsed = time.time() - self.created_at
-        # نعتبره منتهي قبل 5 دقائق من الانتهاء الفعلي
-        return elapsed >= (self.expires_in - 300)
+        return time.time() >= self._deadline
     
     @property
     def time_remaining(self) -> int:
         """الوقت المتبقي بالثواني"""
-        if self.created_at is None:
-            return 0
-        elapsed = time.time() - self.created_at
-        remaining = self.expires_in - elapsed
-        return max(0, int(remaining))
+        return max(0, int(self.created_at + self.expires_in - time.time()))
     
     def to_dict(self) -> dict:
         """تحويل إلى قاموس"""
@@ -84,14 +109,19 @@ class TokenManager:
     - تجديد الـ token
     """
     
-    def __init__(self, tokens_file: Path):
+    def __init__(self, tokens_file: Path, verbose: bool = AUTH_VERBOSE):
         """
         تهيئة مدير الـ Tokens
         
         Args:
             tokens_file: مسار ملف الـ tokens
+            verbose: طباعة رسائل النجاح (افتراضياً من AUTH_VERBOSE)
         """
-        self.tokens_file = Path(tokens_file)
+        self.tokens_file = tokens_file if isinstance(tokens_file, Path) else Path(tokens_file)
+        self._parent = self.tokens_file.parent
+        # إنشاء المجلد مرة واحدة فقط طوال عمر الكائن
+        self._parent_ready = False
+        self.verbose = verbose
         self._token_data: Optional[TokenData] = None
     
     def load(self) -> bool:
@@ -106,8 +136,9 @@ class TokenManager:
             return False
         
         try:
-            with open(self.tokens_file, "r", encoding="utf-8-sig") as f:
-                data = json.load(f)
+            # إزالة BOM إن وجد (ملفات محررة يدوياً في Windows)
+            raw = self.tokens_file.read_bytes().removeprefix(b"\xef\xbb\xbf")
+            data = orjson.loads(raw)
             
             self._token_data = TokenData.from_dict(data)
             
@@ -115,9 +146,10 @@ class TokenManager:
                 console.print("[yellow]⚠ الـ Token منتهي الصلاحية[/yellow]")
                 return False
             
-            hours = self._token_data.time_remaining // 3600
-            minutes = (self._token_data.time_remaining % 3600) // 60
-            console.print(f"[green]✓ تم تحميل Token (صالح لـ {hours}h {minutes}m)[/green]")
+            if self.verbose:
+                hours = self._token_data.time_remaining // 3600
+                minutes = (self._token_data.time_remaining % 3600) // 60
+                console.print(f"[green]✓ تم تحميل Token (صالح لـ {hours}h {minutes}m)[/green]")
             return True
             
         except Exception as e:
@@ -135,12 +167,19 @@ class TokenManager:
             return False
         
         try:
-            self.tokens_file.parent.mkdir(parents=True, exist_ok=True)
+            if not self._parent_ready:
+                self._parent.mkdir(parents=True, exist_ok=True)
+                self._parent_ready = True
             
-            with open(self.tokens_file, "w", encoding="utf-8") as f:
-                json.dump(self._token_data.to_dict(), f, indent=2)
+            # الكتابة لملف مؤقت ثم استبداله (لا يتلف الملف عند انقطاع الكتابة)
+            tmp = self.tokens_file.with_suffix(".tmp")
+            tmp.write_bytes(
+                orjson.dumps(self._token_data.to_dict(), option=orjson.OPT_INDENT_2)
+            )
+            os.replace(tmp, self.tokens_file)
             
-            console.print("[green]✓ تم حفظ الـ tokens[/green]")
+            if self.verbose:
+                console.print("[green]✓ تم حفظ الـ tokens[/green]")
             return True
             
         except Exception as e:
@@ -154,8 +193,8 @@ class TokenManager:
         Args:
             data: بيانات الـ tokens
         """
-        self._token_data = TokenData.from_dict(data)
-        self._token_data.created_at = time.time()
+        # created_at يُمرر عند الإنشاء حتى يُحسب وقت الانتهاء بشكل صحيح
+        self._token_data = TokenData.from_dict({**data, "created_at": time.time()})
         self.save()
     
     @property
@@ -198,25 +237,10 @@ class TokenManager:
         Returns:
             معلومات الـ token
         """
-        if not self.access_token:
+        access_token = self.access_token
+        if not access_token:
             return None
         
-        try:
-            # JWT format: header.payload.signature
-            parts = self.access_token.split(".")
-            if len(parts) != 3:
-                return None
-            
-            # فك تشفير الـ payload
-            payload = parts[1]
-            # إضافة padding إذا لزم الأمر
-            padding = 4 - len(payload) % 4
-            if padding != 4:
-                payload += "=" * padding
-            
-            decoded = base64.urlsafe_b64decode(payload)
-            return json.loads(decoded)
-            
-        except Exception:
-            return None
-
+        # نسخة حتى لا يغيّر المستدعي القيمة المخزنة في الكاش
+        payload = _decode_jwt(access_token)
+        return dict(payload) if payload is not None else None
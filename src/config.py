@@ -30,6 +30,23 @@ COOKIES_FILE = Path(os.getenv("COOKIES_FILE", DATA_DIR / "cookies.txt"))
 # ملف الـ Tokens
 TOKENS_FILE = Path(os.getenv("TOKENS_FILE", DATA_DIR / "tokens.json"))
 
+# حالة جلسة المتصفح (Playwright storage_state) - تُستخدم بين التشغيلات حتى تنتهي صلاحيتها
+STATE_FILE = Path(os.getenv("STATE_FILE", DATA_DIR / "state.json"))
+STATE_MAX_AGE = float(os.getenv("STATE_MAX_AGE", str(12 * 3600)))
+
+# طباعة رسائل المصادقة التفصيلية (تحميل/حفظ الـ cookies والـ tokens)
+AUTH_VERBOSE = os.getenv("AUTH_VERBOSE", "false").lower() == "true"
+
+# حفظ HTML كل تقرير للتصحيح (data/debug_<VIN>.html.gz) - معطل افتراضياً
+DEBUG_HTML = os.getenv("DEBUG_HTML", "false").lower() == "true"
+
+# كاش HTML تقارير المركبات (إعادة المعالجة بدون سحب) - بالثواني، 0 = معطل
+CACHE_DIR = Path(os.getenv("CACHE_DIR", DATA_DIR / "cache"))
+CACHE_TTL = float(os.getenv("CACHE_TTL", "0"))
+
+# محاولة جلب صفحة التقرير عبر httpx (بدون متصفح) قبل Playwright - تجريبي، معطل افتراضياً
+HTTP_FAST_LANE = os.getenv("HTTP_FAST_LANE", "false").lower() == "true"
+
 # إعدادات المتصفح
 HEADLESS = os.getenv("HEADLESS", "true").lower() == "true"
 
@@ -42,6 +59,8 @@ CHROME_USER_DATA_DIR = os.getenv(
 )
 # اسم الـ Profile (Default أو Profile 1, Profile 2, etc)
 CHROME_PROFILE = os.getenv("CHROME_PROFILE", "Default")
+# المسار الكامل للـ Profile (يُحسب مرة واحدة)
+CHROME_PROFILE_DIR = os.path.join(CHROME_USER_DATA_DIR, CHROME_PROFILE) if USE_CHROME_PROFILE else None
 
 # تأخير بين الطلبات
 MIN_DELAY = float(os.getenv("MIN_DELAY", "2"))
@@ -67,9 +86,49 @@ PROXY_PASSWORD = os.getenv("PROXY_PASSWORD", "")
 PROXY_COUNTRY = os.getenv("PROXY_COUNTRY", "us")
 
 
+# القيم التالية لا تتغير بعد الاستيراد، لذا تُحسب مرة واحدة
+HAS_CREDENTIALS = bool(CARFAX_EMAIL and CARFAX_PASSWORD)
+
+# اسم مستخدم البروكسي مع الدولة
+_PROXY_USERNAME_WITH_COUNTRY = PROXY_USERNAME + (f"-country-{PROXY_COUNTRY}" if PROXY_COUNTRY else "")
+_PROXY_ACTIVE = PROXY_ENABLED and bool(PROXY_USERNAME)
+
+
+def _build_playwright_proxy() -> dict | None:
+    """بناء إعدادات البروكسي لـ Playwright (مرة واحدة عند الاستيراد)"""
+    if not _PROXY_ACTIVE:
+        return None
+    
+    return {
+        "server": f"http://{PROXY_SERVER}",
+        "username": _PROXY_USERNAME_WITH_COUNTRY,
+        "password": PROXY_PASSWORD
+    }
+
+
+_PLAYWRIGHT_PROXY = _build_playwright_proxy()
+
+_HTTPX_PROXY = (
+    f"http://{_PROXY_USERNAME_WITH_COUNTRY}:{PROXY_PASSWORD}@{PROXY_SERVER}"
+    if _PROXY_ACTIVE else None
+)
+
+# ملخص الإعدادات (بدون بيانات حساسة)
+_CONFIG_SUMMARY = (
+    ("base_dir", str(BASE_DIR)),
+    ("output_dir", str(OUTPUT_DIR)),
+    ("cookies_file", str(COOKIES_FILE)),
+    ("headless", HEADLESS),
+    ("has_credentials", HAS_CREDENTIALS),
+    ("delay_range", f"{MIN_DELAY}-{MAX_DELAY}s"),
+    ("proxy_enabled", PROXY_ENABLED),
+    ("proxy_server", PROXY_SERVER if PROXY_ENABLED else "غير مفعل"),
+)
+
+
 def validate_credentials() -> bool:
     """التحقق من وجود بيانات الاعتماد"""
-    return bool(CARFAX_EMAIL and CARFAX_PASSWORD)
+    return HAS_CREDENTIALS
 
 
 def get_playwright_proxy() -> dict | None:
@@ -79,19 +138,7 @@ def get_playwright_proxy() -> dict | None:
     Returns:
         قاموس إعدادات البروكسي أو None إذا كان معطل
     """
-    if not PROXY_ENABLED or not PROXY_USERNAME:
-        return None
-    
-    # بناء اسم المستخدم مع الدولة
-    username = PROXY_USERNAME
-    if PROXY_COUNTRY:
-        username += f"-country-{PROXY_COUNTRY}"
-    
-    return {
-        "server": f"http://{PROXY_SERVER}",
-        "username": username,
-        "password": PROXY_PASSWORD
-    }
+    return _PLAYWRIGHT_PROXY
 
 
 def get_httpx_proxy() -> str | None:
@@ -101,27 +148,9 @@ def get_httpx_proxy() -> str | None:
     Returns:
         رابط البروكسي أو None إذا كان معطل
     """
-    if not PROXY_ENABLED or not PROXY_USERNAME:
-        return None
-    
-    # بناء اسم المستخدم مع الدولة
-    username = PROXY_USERNAME
-    if PROXY_COUNTRY:
-        username += f"-country-{PROXY_COUNTRY}"
-    
-    return f"http://{username}:{PROXY_PASSWORD}@{PROXY_SERVER}"
+    return _HTTPX_PROXY
 
 
 def get_config_summary() -> dict:
     """إرجاع ملخص الإعدادات (بدون بيانات حساسة)"""
-    return {
-        "base_dir": str(BASE_DIR),
-        "output_dir": str(OUTPUT_DIR),
-        "cookies_file": str(COOKIES_FILE),
-        "headless": HEADLESS,
-        "has_credentials": validate_credentials(),
-        "delay_range": f"{MIN_DELAY}-{MAX_DELAY}s",
-        "proxy_enabled": PROXY_ENABLED,
-        "proxy_server": PROXY_SERVER if PROXY_ENABLED else "غير مفعل"
-    }
-
+    return dict(_CONFIG_SUMMARY)
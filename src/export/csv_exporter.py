@@ -4,19 +4,26 @@ CSV Exporter Module
 تصدير البيانات إلى ملفات CSV
 """
 
+import asyncio
 import csv
+import gzip
+import re
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import Optional, AsyncIterable, TYPE_CHECKING
 
-import pandas as pd
-from rich.console import Console
 from rich.table import Table
 
-from ..scraper.vehicle_history import VehicleReport
+from ..log import console
 from ..config import OUTPUT_DIR
 
-console = Console()
+if TYPE_CHECKING:
+    # للـ type hints فقط - لا نستورد Playwright عند التصدير
+    from ..scraper.vehicle_history import VehicleReport
+
+
+# الحقول التي تحتاج quoting حسب csv (QUOTE_MINIMAL)
+_NEEDS_QUOTE = re.compile(r'[,"\r\n]').search
 
 
 class CSVExporter:
@@ -79,9 +86,10 @@ class CSVExporter:
         
     def export(
         self, 
-        reports: list[VehicleReport],
+        reports: list["VehicleReport"],
         filename: Optional[str] = None,
-        append: bool = False
+        append: bool = False,
+        quiet: bool = False
     ) -> Path:
         """
         تصدير التقارير إلى CSV
@@ -90,6 +98,7 @@ class CSVExporter:
             reports: قائمة التقارير
             filename: اسم الملف (اختياري)
             append: إضافة إلى ملف موجود
+            quiet: عدم طباعة رسالة التصدير
             
         Returns:
             مسار الملف المُنشأ
@@ -103,49 +112,144 @@ class CSVExporter:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"carfax_reports_{timestamp}.csv"
         
-        # التأكد من امتداد .csv
-        if not filename.endswith(".csv"):
+        # التأكد من امتداد .csv (أو .csv.gz للضغط)
+        if not filename.endswith((".csv", ".csv.gz")):
             filename += ".csv"
             
         output_path = self.output_dir / filename
         
-        # تحويل التقارير إلى قائمة قواميس
-        data = []
-        for report in reports:
-            if hasattr(report, 'to_dict'):
-                data.append(report.to_dict())
-            elif isinstance(report, dict):
-                data.append(report)
-            else:
-                data.append(vars(report))
-        
-        # إنشاء DataFrame
-        df = pd.DataFrame(data, columns=self.DEFAULT_COLUMNS)
-        
-        # تغيير العناوين للعربية إذا مطلوب
-        if self.use_arabic_headers:
-            df.columns = [self.ARABIC_COLUMNS.get(col, col) for col in df.columns]
+        # تحويل التقارير إلى صفوف (generator - بدون بناء قائمة كاملة)
+        columns = self.DEFAULT_COLUMNS
+        rows = (
+            report.to_row() if hasattr(report, 'to_row')
+            else self._dict_to_row(self._as_dict(report), columns)
+            for report in reports
+        )
         
         # الكتابة للملف
         mode = "a" if append and output_path.exists() else "w"
         header = not (append and output_path.exists())
         
-        df.to_csv(
-            output_path,
-            mode=mode,
-            header=header,
-            index=False,
-            encoding="utf-8-sig"  # للدعم الأفضل في Excel
-        )
+        # utf-8-sig للدعم الأفضل في Excel
+        if filename.endswith(".gz"):
+            # gzip بمستوى 1: ضغط جيد بتكلفة CPU شبه معدومة
+            # (BOM في بداية الملف فقط - الإضافة تُنشئ gzip member جديد)
+            f = gzip.open(
+                output_path,
+                mode + "t",
+                compresslevel=1,
+                encoding="utf-8-sig" if mode == "w" else "utf-8",
+                newline=""
+            )
+        else:
+            f = open(output_path, mode, encoding="utf-8-sig", newline="", buffering=1 << 20)
         
-        console.print(f"[green]✓ تم تصدير {len(reports)} تقرير إلى:[/green]")
-        console.print(f"  [blue]{output_path}[/blue]")
+        with f:
+            # lineterminator="\n" مثل الإخراج السابق (pandas)
+            writer = csv.writer(f, lineterminator="\n")
+            
+            if header:
+                # تغيير العناوين للعربية إذا مطلوب
+                if self.use_arabic_headers:
+                    writer.writerow([self.ARABIC_COLUMNS.get(col, col) for col in columns])
+                else:
+                    writer.writerow(columns)
+            
+            self._write_rows(f, writer, rows)
+        
+        if not quiet:
+            console.print(f"[green]✓ تم تصدير {len(reports)} تقرير إلى:[/green]")
+            console.print(f"  [blue]{output_path}[/blue]")
         
         return output_path
     
+    async def export_stream(
+        self,
+        reports: AsyncIterable["VehicleReport"],
+        filename: Optional[str] = None,
+        append: bool = False,
+        chunk_size: int = 1000
+    ) -> tuple[Optional[Path], int]:
+        """
+        تصدير التقارير على دفعات أثناء السحب
+        
+        كل دفعة تُكتب في thread منفصل بينما يستمر السحب،
+        والدفعة التالية تنتظر انتهاء السابقة (ترتيب الكتابة محفوظ)
+        
+        Args:
+            reports: مصدر التقارير (async generator)
+            filename: اسم الملف (اختياري)
+            append: إضافة إلى ملف موجود
+            chunk_size: عدد التقارير في كل دفعة
+            
+        Returns:
+            (مسار الملف، عدد التقارير المُصدّرة)
+        """
+        # اسم ثابت لكل الدفعات
+        if not filename:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"carfax_reports_{timestamp}.csv"
+        
+        output_path = None
+        pending: Optional[asyncio.Task] = None
+        batch = []
+        count = 0
+        
+        try:
+            async for report in reports:
+                batch.append(report)
+                if len(batch) < chunk_size:
+                    continue
+                
+                if pending:
+                    output_path = await pending
+                pending = asyncio.create_task(
+                    asyncio.to_thread(self.export, batch, filename, append, True)
+                )
+                append = True
+                count += len(batch)
+                batch = []
+        finally:
+            if pending:
+                output_path = await pending
+        
+        if batch:
+            output_path = await asyncio.to_thread(self.export, batch, filename, append, True)
+            count += len(batch)
+        
+        return output_path, count
+    
+    @staticmethod
+    def _write_rows(f, writer, rows) -> None:
+        """
+        كتابة الصفوف: join مباشر للصفوف العادية،
+        و csv.writer فقط للصفوف التي تحتوي , أو " أو سطر جديد
+        """
+        write = f.write
+        for row in rows:
+            fields = ["" if v is None else str(v) for v in row]
+            if any(map(_NEEDS_QUOTE, fields)):
+                writer.writerow(fields)
+            else:
+                write(",".join(fields) + "\n")
+    
+    @staticmethod
+    def _as_dict(report) -> dict:
+        """تحويل تقرير بدون to_row إلى قاموس"""
+        if hasattr(report, 'to_dict'):
+            return report.to_dict()
+        if isinstance(report, dict):
+            return report
+        return vars(report)
+    
+    @staticmethod
+    def _dict_to_row(data: dict, columns: list[str]) -> tuple:
+        """تحويل قاموس إلى صف بترتيب الأعمدة (القيم الناقصة فارغة)"""
+        return tuple(data.get(col) for col in columns)
+    
     def export_single(
         self, 
-        report: VehicleReport,
+        report: "VehicleReport",
         filename: Optional[str] = None
     ) -> Path:
         """
@@ -162,7 +266,7 @@ class CSVExporter:
     
     def append_to_file(
         self, 
-        reports: list[VehicleReport],
+        reports: list["VehicleReport"],
         filename: str
     ) -> Path:
         """
@@ -177,7 +281,7 @@ class CSVExporter:
         """
         return self.export(reports, filename, append=True)
     
-    def display_summary(self, reports: list[VehicleReport]) -> None:
+    def display_summary(self, reports: list["VehicleReport"]) -> None:
         """
         عرض ملخص التقارير في الـ console
         
@@ -229,7 +333,7 @@ class CSVExporter:
 
 
 def quick_export(
-    reports: list[VehicleReport],
+    reports: list["VehicleReport"],
     filename: Optional[str] = None
 ) -> Path:
     """
@@ -0,0 +1,9 @@
+"""
+Logging Module
+==============
+Console مشترك لكل الوحدات (بدلاً من إنشاء Console في كل ملف)
+"""
+
+from rich.console import Console
+
+console = Console()
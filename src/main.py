@@ -34,15 +34,9 @@ from .config import (
 )
 from .auth.cookies import CookieManager
 from .auth.tokens import TokenManager
-from .auth.login import AutoLogin, ensure_authenticated
-from .scraper.vehicle_history import (
-    VehicleHistoryScraper,
-    scrape_single_vin,
-    scrape_multiple_vins
-)
-from .scraper.api_scraper import CarfaxAPIScraper, scrape_with_api
-from .scraper.full_report_scraper import scrape_full_report
-from .export.csv_exporter import CSVExporter
+
+# وحدات Playwright / httpx / التصدير تُستورد داخل الأوامر التي تحتاجها
+# (أوامر مثل status و clear و --version لا تدفع تكلفة استيرادها)
 
 
 def print_banner():
@@ -60,6 +54,13 @@ def print_banner():
     console.print()
 
 
+def _playwright_missing(e: ImportError) -> None:
+    """رسالة واضحة عند عدم تثبيت Playwright (وضع API لا يحتاجه)"""
+    console.print(f"[red]✗ هذا الأمر يتطلب Playwright: {e}[/red]")
+    console.print("[dim]  pip install playwright && playwright install chromium[/dim]")
+    console.print("[dim]  أو استخدم --api للسحب بدون متصفح[/dim]")
+
+
 @click.group()
 @click.version_option(version="1.0.0")
 def cli():
@@ -82,7 +83,10 @@ def cli():
 @click.option("--output", "-o", help="اسم ملف الإخراج")
 @click.option("--append", "-a", is_flag=True, help="إضافة إلى ملف موجود")
 @click.option("--api", is_flag=True, help="استخدام API مباشرة (أسرع)")
-def scrape(vin: Optional[str], file_path: Optional[str], output: Optional[str], append: bool, api: bool):
+@click.option("--concurrency", "-c", type=click.IntRange(min=1), default=8, show_default=True,
+              help="عدد الـ VINs التي تُسحب في نفس الوقت")
+def scrape(vin: Optional[str], file_path: Optional[str], output: Optional[str], append: bool, api: bool,
+           concurrency: int):
     """
     سحب تقارير تاريخ المركبات
     
@@ -90,6 +94,7 @@ def scrape(vin: Optional[str], file_path: Optional[str], output: Optional[str],
     أمثلة:
       python -m src.main scrape --vin "1HGBH41JXMN109186"
       python -m src.main scrape --file vins.txt --output results.csv
+      python -m src.main scrape --file vins.txt --concurrency 4
     """
     print_banner()
     
@@ -106,11 +111,13 @@ def scrape(vin: Optional[str], file_path: Optional[str], output: Optional[str],
         
     if file_path:
         try:
-            with open(file_path, "r") as f:
-                for line in f:
-                    line = line.strip().upper()
-                    if line and len(line) == 17:
-                        vins.append(line)
+            # القراءة كـ bytes والفك مرة واحدة (فك صارم: حرف غير صالح يُبلَّغ بدلاً من حذفه بصمت
+            # وتحويل VIN خاطئ إلى رقم آخر صالح الطول)
+            raw = Path(file_path).read_bytes()
+            vins.extend(
+                s for s in (ln.strip().upper() for ln in raw.decode("utf-8-sig").splitlines())
+                if len(s) == 17
+            )
         except Exception as e:
             console.print(f"[red]✗ خطأ في قراءة الملف: {e}[/red]")
             sys.exit(1)
@@ -119,6 +126,12 @@ def scrape(vin: Optional[str], file_path: Optional[str], output: Optional[str],
         console.print("[red]✗ لم يتم العثور على أرقام VIN صالحة[/red]")
         sys.exit(1)
     
+    # إزالة التكرار مع الحفاظ على الترتيب
+    original_count = len(vins)
+    vins = list(dict.fromkeys(vins))
+    if len(vins) < original_count:
+        console.print(f"[dim]  (تمت إزالة {original_count - len(vins)} رقم مكرر)[/dim]")
+    
     console.print(f"[cyan]📋 تم العثور على {len(vins)} رقم VIN[/cyan]")
     
     if api:
@@ -127,16 +140,19 @@ def scrape(vin: Optional[str], file_path: Optional[str], output: Optional[str],
     console.print()
     
     # تشغيل الـ Scraper
-    asyncio.run(_run_scraper(vins, output, append, api))
+    asyncio.run(_run_scraper(vins, output, append, api, concurrency))
 
 
-async def _run_scraper(vins: list[str], output: Optional[str], append: bool, use_api: bool = False):
+async def _run_scraper(
+    vins: list[str], output: Optional[str], append: bool, use_api: bool = False, concurrency: int = 8
+):
     """تشغيل عملية السحب"""
-    
-    reports = []
+    from .export.csv_exporter import CSVExporter
     
     # استخدام API إذا كان متاحاً
     if use_api:
+        from .scraper.api_scraper import CarfaxAPIScraper, shutdown_clients
+        
         token_manager = TokenManager(TOKENS_FILE)
         
         if not token_manager.load():
@@ -144,24 +160,32 @@ async def _run_scraper(vins: list[str], output: Optional[str], append: bool, use
             console.print("[yellow]  قم بإضافة tokens.json في مجلد data/[/yellow]")
             return
         
-        scraper = CarfaxAPIScraper(token_manager)
+        scraper = CarfaxAPIScraper(token_manager, concurrency=concurrency)
+        exporter = CSVExporter(OUTPUT_DIR)
         
-        async for report in scraper.get_reports(vins):
-            if hasattr(report, 'to_dict'):
-                reports.append(report.to_dict())
-            else:
-                reports.append(report)
+        try:
+            # التصدير على دفعات أثناء السحب (الكتابة تتداخل مع انتظار الشبكة)
+            output_file, count = await exporter.export_stream(
+                scraper.get_reports(vins), filename=output, append=append
+            )
+        finally:
+            await shutdown_clients()
         
         # تصدير النتائج
-        if reports:
-            exporter = CSVExporter(OUTPUT_DIR)
-            output_file = exporter.export(reports, filename=output, append=append)
-            console.print(f"\n[green]✓ تم تصدير {len(reports)} تقرير إلى:[/green]")
+        if count:
+            console.print(f"\n[green]✓ تم تصدير {count} تقرير إلى:[/green]")
             console.print(f"  [blue]{output_file}[/blue]")
         
         return
     
     # الوضع العادي (Playwright)
+    try:
+        from .auth.login import ensure_authenticated
+        from .scraper.vehicle_history import scrape_multiple_vins
+    except ImportError as e:
+        _playwright_missing(e)
+        return
+    
     # إعداد مدير الـ Cookies
     cookie_manager = CookieManager(COOKIES_FILE)
     
@@ -177,7 +201,7 @@ async def _run_scraper(vins: list[str], output: Optional[str], append: bool, use
     console.print()
     
     # سحب التقارير
-    reports = await scrape_multiple_vins(vins, cookie_manager)
+    reports = await scrape_multiple_vins(vins, cookie_manager, concurrency=concurrency)
     
     console.print()
     
@@ -188,7 +212,7 @@ async def _run_scraper(vins: list[str], output: Optional[str], append: bool, use
     # تصدير إلى CSV
     if reports:
         console.print()
-        exporter.export(reports, output, append)
+        await asyncio.to_thread(exporter.export, reports, output, append)
 
 
 @cli.command()
@@ -211,6 +235,12 @@ def login():
 
 async def _run_login():
     """تنفيذ تسجيل الدخول"""
+    try:
+        from .auth.login import AutoLogin
+    except ImportError as e:
+        _playwright_missing(e)
+        sys.exit(1)
+    
     cookie_manager = CookieManager(COOKIES_FILE)
     auto_login = AutoLogin(cookie_manager)
     
@@ -276,7 +306,7 @@ def status():
 @click.option("--vin", "-v", required=True, help="رقم VIN للمركبة")
 @click.option("--wholesale", "-w", is_flag=True, default=True, help="استخراج سعر Wholesale (مفعّل افتراضياً)")
 @click.option("--no-wholesale", is_flag=True, help="تخطي استخراج أسعار Wholesale")
-@click.option("--fast", "-f", is_flag=True, help="الوضع السريع (بدون حفظ ملفات debug)")
+@click.option("--fast", "-f", is_flag=True, help="الوضع السريع (headless وبدون صور/خطوط؛ حفظ HTML للتصحيح يتطلب DEBUG_HTML=true وغير الوضع السريع)")
 def fullreport(vin: str, wholesale: bool, no_wholesale: bool, fast: bool):
     """
     سحب التقرير الكامل مع كل البيانات (JSON + CSV)
@@ -301,7 +331,16 @@ def fullreport(vin: str, wholesale: bool, no_wholesale: bool, fast: bool):
 
 async def _run_full_report(vin: str, get_wholesale: bool = True, fast_mode: bool = False):
     """تنفيذ سحب التقرير الكامل"""
-    report = await scrape_full_report(vin, str(OUTPUT_DIR), get_wholesale, fast_mode)
+    try:
+        from .scraper.full_report_scraper import scrape_full_report, shutdown_browser
+    except ImportError as e:
+        _playwright_missing(e)
+        return
+    
+    try:
+        report = await scrape_full_report(vin, str(OUTPUT_DIR), get_wholesale, fast_mode)
+    finally:
+        await shutdown_browser()
     
     if report.error:
         console.print(f"[red]✗ خطأ: {report.error}[/red]")
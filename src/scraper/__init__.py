@@ -4,7 +4,12 @@ Scraper Module
 سحب البيانات من Carfax
 """
 
-from .vehicle_history import VehicleHistoryScraper
-
 __all__ = ["VehicleHistoryScraper"]
 
+
+def __getattr__(name: str):
+    # استيراد كسول: وحدة api_scraper لا يجب أن تستورد Playwright
+    if name == "VehicleHistoryScraper":
+        from .vehicle_history import VehicleHistoryScraper
+        return VehicleHistoryScraper
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
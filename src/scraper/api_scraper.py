@@ -5,26 +5,72 @@ API Scraper Module
 """
 
 import asyncio
-import random
+import re
+from contextlib import nullcontext
 from dataclasses import dataclass, field
 from datetime import datetime
+from types import MappingProxyType
 from typing import Optional, AsyncGenerator
 from pathlib import Path
 
 import httpx
-from rich.console import Console
+import orjson
+from aiolimiter import AsyncLimiter
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
 
+from ..log import console
 from ..auth.tokens import TokenManager
 from ..config import MIN_DELAY, MAX_DELAY, PROXY_ENABLED, get_httpx_proxy
 
-console = Console()
 
+# VIN: 17 حرف/رقم بدون I و O و Q
+_VIN_RE = re.compile(r"^[A-HJ-NPR-Z0-9]{17}$")
 
-@dataclass
+# قاموس فارغ ثابت (للقراءة فقط) بدلاً من إنشاء {} عند كل مفتاح ناقص
+_EMPTY = MappingProxyType({})
+
+# HTTP clients مشتركة بين كل الـ scrapers (مفتاحها إعدادات البروكسي والتزامن)
+_CLIENT_CACHE: dict[tuple, httpx.AsyncClient] = {}
+# الـ event loop الذي أُنشئت فيه الـ clients (اتصالاتها لا تعمل في loop آخر)
+_CLIENT_LOOP: Optional[asyncio.AbstractEventLoop] = None
+# مراجع مهام التسخين حتى لا يجمعها الـ GC قبل انتهائها
+_WARMUP_TASKS: set[asyncio.Task] = set()
+
+
+async def _warmup(client: httpx.AsyncClient, url: str) -> None:
+    """طلب HEAD لتجهيز DNS والاتصال (الأخطاء تُتجاهل)"""
+    try:
+        await client.head(url)
+    except Exception:
+        pass
+
+
+async def shutdown_clients() -> None:
+    """إغلاق كل الـ HTTP clients المشتركة (عند خروج البرنامج)"""
+    for task in _WARMUP_TASKS:
+        task.cancel()
+    _WARMUP_TASKS.clear()
+    
+    clients = list(_CLIENT_CACHE.values())
+    _CLIENT_CACHE.clear()
+    if _CLIENT_LOOP is not asyncio.get_running_loop():
+        # clients من loop منتهٍ (asyncio.run سابق) - لا يمكن إغلاقها من هنا
+        return
+    for client in clients:
+        if not client.is_closed:
+            await client.aclose()
+
+
+@dataclass(slots=True)
 class VehicleReport:
     """نموذج بيانات تقرير المركبة"""
     
+    # ترتيب أعمدة التصدير (مطابق لـ CSVExporter.DEFAULT_COLUMNS)
+    EXPORT_FIELDS = (
+        "vin", "year", "make", "model", "trim", "owners", "accidents",
+        "service_records", "mileage", "title_status", "report_date", "error"
+    )
+    
     vin: str
     year: Optional[str] = None
     make: Optional[str] = None
@@ -37,7 +83,8 @@ class VehicleReport:
     mileage: Optional[str] = None
     title_status: Optional[str] = None
     report_date: str = field(default_factory=lambda: datetime.now().strftime("%Y-%m-%d"))
-    raw_data: dict = field(default_factory=dict)
+    # استجابة API الكاملة (فقط مع keep_raw=True)
+    raw_data: Optional[dict] = field(default=None, repr=False)
     error: Optional[str] = None
     
     def to_dict(self) -> dict:
@@ -57,6 +104,10 @@ class VehicleReport:
             "report_date": self.report_date,
             "error": self.error
         }
+    
+    def to_row(self) -> tuple:
+        """تحويل إلى صف CSV بترتيب EXPORT_FIELDS (بدون قاموس وسيط)"""
+        return tuple(getattr(self, f) for f in self.EXPORT_FIELDS)
 
 
 class CarfaxAPIScraper:
@@ -73,44 +124,97 @@ class CarfaxAPIScraper:
     VHR_ENDPOINT = "/api/vhr"
     VEHICLE_SEARCH_ENDPOINT = "/api/vehicle"
     
-    def __init__(self, token_manager: TokenManager):
+    # الروابط تُحلل مرة واحدة: GET نسبي لـ base_url الـ client، و POST رابط كامل
+    VHR_BASE_URL = httpx.URL(f"{BASE_URL}{VHR_ENDPOINT}/")
+    VHR_POST_URL = httpx.URL(f"{BASE_URL}{VHR_ENDPOINT}")
+    
+    def __init__(
+        self,
+        token_manager: TokenManager,
+        concurrency: int = 8,
+        verbose: bool = False,
+        keep_raw: bool = False
+    ):
         """
         تهيئة الـ API Scraper
         
         Args:
             token_manager: مدير الـ tokens
+            concurrency: عدد الطلبات المتزامنة
+            verbose: طباعة رسائل التصحيح لكل VIN (Status / Response)
+            keep_raw: الاحتفاظ باستجابة API الكاملة في raw_data (تستهلك ذاكرة كبيرة)
         """
         self.token_manager = token_manager
+        self.concurrency = max(1, concurrency)
+        self.verbose = verbose
+        self.keep_raw = keep_raw
+        # تحديد المعدل: متوسط طلب واحد كل (MIN_DELAY+MAX_DELAY)/2 ثانية عبر كل الـ workers
+        # مع السماح بدفعة حتى concurrency طلب متزامن (وإلا لا فائدة من التزامن)
+        period = (MIN_DELAY + MAX_DELAY) / 2
+        self._limiter = (
+            AsyncLimiter(max_rate=self.concurrency, time_period=period * self.concurrency)
+            if period > 0 else nullcontext()
+        )
+        # الطريقة التي نجحت (بعد أول POST ناجح لا داعي لتجربة GET لكل VIN)
+        self._preferred_method = "GET"
+        # header المصادقة (يُبنى مرة واحدة ويُعاد بناؤه عند 401)
+        self._auth_headers: Optional[dict] = None
         self._client: Optional[httpx.AsyncClient] = None
     
     async def _get_client(self) -> httpx.AsyncClient:
-        """الحصول على HTTP client مع دعم البروكسي"""
+        """الحصول على HTTP client مشترك مع دعم البروكسي"""
+        global _CLIENT_LOOP
+        loop = asyncio.get_running_loop()
+        if _CLIENT_LOOP is not loop:
+            # loop جديد (asyncio.run آخر): الـ clients السابقة مرتبطة بالـ loop القديم
+            _CLIENT_CACHE.clear()
+            _WARMUP_TASKS.clear()
+            _CLIENT_LOOP = loop
+            self._client = None
+        
         if self._client is None or self._client.is_closed:
             # إعداد البروكسي إذا كان مفعل
             proxy_url = get_httpx_proxy()
+            key = (proxy_url, PROXY_ENABLED, self.concurrency)
             
-            # تعطيل التحقق من SSL عند استخدام البروكسي (Bright Data يستخدم self-signed cert)
-            self._client = httpx.AsyncClient(
-                timeout=30.0,
-                proxy=proxy_url,
-                verify=not PROXY_ENABLED,  # تعطيل SSL verification مع البروكسي
-                headers={
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-                    "Accept": "application/json",
-                    "Origin": "https://www.carfaxonline.com",
-                    "Referer": "https://www.carfaxonline.com/"
-                }
-            )
+            client = _CLIENT_CACHE.get(key)
+            if client is None or client.is_closed:
+                # تعطيل التحقق من SSL عند استخدام البروكسي (Bright Data يستخدم self-signed cert)
+                # HTTP/2 لتمرير الطلبات المتزامنة عبر اتصال واحد
+                client = httpx.AsyncClient(
+                    base_url=self.VHR_BASE_URL,
+                    http2=True,
+                    limits=httpx.Limits(
+                        max_keepalive_connections=self.concurrency,
+                        max_connections=self.concurrency
+                    ),
+                    timeout=30.0,
+                    proxy=proxy_url,
+                    verify=not PROXY_ENABLED,  # تعطيل SSL verification مع البروكسي
+                    headers={
+                        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+                        "Accept": "application/json",
+                        "Origin": "https://www.carfaxonline.com",
+                        "Referer": "https://www.carfaxonline.com/"
+                    }
+                )
+                _CLIENT_CACHE[key] = client
+                
+                # تسخين الاتصال في الخلفية
+                task = asyncio.create_task(_warmup(client, self.BASE_URL))
+                _WARMUP_TASKS.add(task)
+                task.add_done_callback(_WARMUP_TASKS.discard)
+                
+                if PROXY_ENABLED:
+                    console.print("[cyan]  🌐 API: البروكسي مفعل[/cyan]")
             
-            if PROXY_ENABLED:
-                console.print("[cyan]  🌐 API: البروكسي مفعل[/cyan]")
+            self._client = client
         
         return self._client
     
     async def close(self):
-        """إغلاق الـ client"""
-        if self._client and not self._client.is_closed:
-            await self._client.aclose()
+        """ترك الـ client المشترك (يُغلق عبر shutdown_clients)"""
+        self._client = None
     
     async def get_report(self, vin: str) -> VehicleReport:
         """
@@ -130,58 +234,27 @@ class CarfaxAPIScraper:
         if not self.token_manager.is_valid:
             return VehicleReport(vin=vin, error="Token غير صالح أو منتهي")
         
-        console.print(f"[blue]🔍 API: جاري سحب تقرير: {vin}[/blue]")
+        if self.verbose:
+            console.print(f"[blue]🔍 API: جاري سحب تقرير: {vin}[/blue]", highlight=False)
         
         try:
             client = await self._get_client()
-            headers = self.token_manager.get_auth_header()
-            
-            # طلب التقرير - نجرب GET أولاً
-            response = await client.get(
-                f"{self.BASE_URL}{self.VHR_ENDPOINT}/{vin}",
-                headers=headers
-            )
+            headers = self._headers()
             
-            # إذا فشل GET، نجرب POST
-            if response.status_code == 404 or response.status_code == 405:
-                response = await client.post(
-                    f"{self.BASE_URL}{self.VHR_ENDPOINT}",
-                    headers=headers,
-                    json={"vin": vin}
-                )
+            response = await self._fetch(client, vin, headers)
             
             if response.status_code == 401:
-                return VehicleReport(vin=vin, error="Token منتهي - يرجى تجديده")
-            
-            if response.status_code == 404:
-                return VehicleReport(vin=vin, error="VIN غير موجود")
+                # ربما تم تجديد tokens.json - إعادة التحميل والمحاولة مرة واحدة
+                self._auth_headers = None
+                if self.token_manager.load() and self._headers() != headers:
+                    await response.aclose()
+                    response = await self._fetch(client, vin, self._auth_headers)
             
-            # طباعة معلومات الاستجابة للتصحيح
-            console.print(f"[dim]  Status: {response.status_code}[/dim]")
-            
-            if response.status_code != 200:
-                console.print(f"[dim]  Response: {response.text[:200]}...[/dim]")
-                return VehicleReport(
-                    vin=vin, 
-                    error=f"خطأ API: {response.status_code}"
-                )
-            
-            # التحقق من أن الاستجابة JSON
-            content_type = response.headers.get("content-type", "")
-            if "application/json" not in content_type:
-                console.print(f"[yellow]  ⚠ Content-Type: {content_type}[/yellow]")
-                console.print(f"[dim]  Response: {response.text[:300]}...[/dim]")
-                return VehicleReport(vin=vin, error="الاستجابة ليست JSON")
-            
-            data = response.json()
-            
-            # استخراج البيانات
-            report = self._parse_report(vin, data)
-            
-            # تأخير عشوائي
-            await asyncio.sleep(random.uniform(MIN_DELAY, MAX_DELAY))
-            
-            return report
+            # الاستجابة stream: الـ body يُقرأ فقط عند الحاجة، ويُغلق دائماً
+            try:
+                return await self._handle_response(vin, response)
+            finally:
+                await response.aclose()
             
         except httpx.TimeoutException:
             return VehicleReport(vin=vin, error="انتهت مهلة الاتصال")
@@ -189,13 +262,88 @@ class CarfaxAPIScraper:
             console.print(f"[red]✗ خطأ: {e}[/red]")
             return VehicleReport(vin=vin, error=str(e))
     
+    async def _handle_response(self, vin: str, response: httpx.Response) -> VehicleReport:
+        """تحويل الاستجابة إلى تقرير (بدون تحميل body الأخطاء إلا في وضع verbose)"""
+        if response.status_code == 401:
+            return VehicleReport(vin=vin, error="Token منتهي - يرجى تجديده")
+        
+        if response.status_code == 404:
+            return VehicleReport(vin=vin, error="VIN غير موجود")
+        
+        if response.status_code != 200:
+            # طباعة معلومات الاستجابة للتصحيح (رسالة واحدة)
+            if self.verbose:
+                await response.aread()
+                console.print(
+                    f"[dim]  Status: {response.status_code}\n"
+                    f"  Response: {response.text[:200]}...[/dim]",
+                    highlight=False
+                )
+            return VehicleReport(
+                vin=vin, 
+                error=f"خطأ API: {response.status_code}"
+            )
+        
+        # التحقق من أن الاستجابة JSON
+        content_type = response.headers.get("content-type", "")
+        if "application/json" not in content_type:
+            console.print(f"[yellow]  ⚠ Content-Type: {content_type}[/yellow]", highlight=False)
+            if self.verbose:
+                await response.aread()
+                console.print(f"[dim]  Response: {response.text[:300]}...[/dim]", highlight=False)
+            return VehicleReport(vin=vin, error="الاستجابة ليست JSON")
+        
+        # orjson يقرأ الـ bytes مباشرة (بدون فك إلى str)
+        data = orjson.loads(await response.aread())
+        
+        # استخراج البيانات
+        return self._parse_report(vin, data)
+    
+    def _headers(self) -> dict:
+        """header المصادقة المخزن (نفس القاموس لكل الطلبات)"""
+        if self._auth_headers is None:
+            self._auth_headers = self.token_manager.get_auth_header()
+        return self._auth_headers
+    
+    async def _fetch(self, client: httpx.AsyncClient, vin: str, headers: dict) -> httpx.Response:
+        """
+        طلب التقرير - نجرب GET أولاً، وإذا فشل نجرب POST (ونتذكر POST إذا نجح)
+        
+        الاستجابة تُعاد كـ stream غير مقروء - المستدعي مسؤول عن aclose()
+        """
+        async with self._limiter:
+            if self._preferred_method == "POST":
+                return await self._post(client, vin, headers)
+            
+            response = await client.send(
+                client.build_request("GET", vin, headers=headers),
+                stream=True
+            )
+            
+            if response.status_code == 404 or response.status_code == 405:
+                await response.aclose()
+                response = await self._post(client, vin, headers)
+                if response.status_code == 200:
+                    self._preferred_method = "POST"
+        
+        return response
+    
+    async def _post(self, client: httpx.AsyncClient, vin: str, headers: dict) -> httpx.Response:
+        """طلب التقرير عبر POST (stream)"""
+        return await client.send(
+            client.build_request("POST", self.VHR_POST_URL, headers=headers, json={"vin": vin}),
+            stream=True
+        )
+    
     async def get_reports(
         self, 
         vins: list[str],
         progress_callback: Optional[callable] = None
     ) -> AsyncGenerator[VehicleReport, None]:
         """
-        سحب تقارير متعددة
+        سحب تقارير متعددة بالتوازي (حتى concurrency طلب في نفس الوقت)
+        
+        التقارير تُعاد بترتيب اكتمالها وليس بترتيب القائمة
         
         Args:
             vins: قائمة أرقام VIN
@@ -205,41 +353,47 @@ class CarfaxAPIScraper:
             تقارير المركبات
         """
         total = len(vins)
+        sem = asyncio.Semaphore(self.concurrency)
         
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
             BarColumn(),
             TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-            console=console
+            console=console,
+            # إعادة الرسم بمعدل ثابت مهما كثرت التقارير المكتملة
+            refresh_per_second=4,
+            transient=True,
+            disable=not console.is_terminal
         ) as progress:
             task = progress.add_task(f"[cyan]سحب {total} تقرير (API)...", total=total)
             
-            for i, vin in enumerate(vins):
-                report = await self.get_report(vin)
-                
-                progress.update(task, advance=1)
-                
-                if progress_callback:
-                    progress_callback(i + 1, total, report)
-                
-                yield report
-        
-        await self.close()
+            tasks = [asyncio.create_task(self._bounded_get(vin, sem)) for vin in vins]
+            
+            try:
+                for i, coro in enumerate(asyncio.as_completed(tasks)):
+                    report = await coro
+                    
+                    progress.update(task, advance=1)
+                    
+                    if progress_callback:
+                        progress_callback(i + 1, total, report)
+                    
+                    yield report
+            finally:
+                # إلغاء المهام المتبقية إذا توقف المستهلك مبكراً
+                for t in tasks:
+                    t.cancel()
     
-    def _validate_vin(self, vin: str) -> bool:
+    async def _bounded_get(self, vin: str, sem: asyncio.Semaphore) -> VehicleReport:
+        """سحب تقرير مع احترام حد التزامن"""
+        async with sem:
+            return await self.get_report(vin)
+    
+    @staticmethod
+    def _validate_vin(vin: str) -> bool:
         """التحقق من صحة VIN"""
-        if not vin:
-            return False
-        
-        vin = vin.strip().upper()
-        if len(vin) != 17:
-            return False
-        
-        if any(c in vin for c in "IOQ"):
-            return False
-        
-        return True
+        return bool(vin and _VIN_RE.match(vin.strip().upper()))
     
     def _parse_report(self, vin: str, data: dict) -> VehicleReport:
         """
@@ -252,37 +406,41 @@ class CarfaxAPIScraper:
         Returns:
             تقرير المركبة
         """
-        report = VehicleReport(vin=vin, raw_data=data)
+        report = VehicleReport(vin=vin, raw_data=data if self.keep_raw else None)
         
         try:
+            # استخراج الأقسام مرة واحدة
+            vehicle = data.get("vehicle") or _EMPTY
+            summary = data.get("summary") or _EMPTY
+            odometer = data.get("odometer") or _EMPTY
+            title = data.get("title") or _EMPTY
+            v_get, s_get = vehicle.get, summary.get
+            
             # استخراج معلومات المركبة
-            vehicle = data.get("vehicle", {})
-            report.year = str(vehicle.get("year", ""))
-            report.make = vehicle.get("make", "")
-            report.model = vehicle.get("model", "")
-            report.trim = vehicle.get("trim", "")
+            report.year = str(v_get("year", ""))
+            report.make = v_get("make", "")
+            report.model = v_get("model", "")
+            report.trim = v_get("trim", "")
             
             # استخراج الإحصائيات
-            summary = data.get("summary", {})
-            report.owners = summary.get("ownerCount")
-            report.accidents = summary.get("accidentCount", 0)
-            report.damage_reported = summary.get("damageReported", False)
-            report.service_records = summary.get("serviceRecordCount")
+            report.owners = s_get("ownerCount")
+            report.accidents = s_get("accidentCount", 0)
+            report.damage_reported = s_get("damageReported", False)
+            report.service_records = s_get("serviceRecordCount")
             
             # استخراج المسافة
-            odometer = data.get("odometer", {})
             if odometer:
                 report.mileage = str(odometer.get("lastReading", ""))
             
             # استخراج حالة العنوان
-            title = data.get("title", {})
             if title:
                 report.title_status = title.get("status", "")
             
             if report.year and report.make:
                 console.print(
                     f"[green]  ✓ {report.year} {report.make} {report.model} | "
-                    f"Owners: {report.owners} | Accidents: {report.accidents}[/green]"
+                    f"Owners: {report.owners} | Accidents: {report.accidents}[/green]",
+                    highlight=False
                 )
             
         except Exception as e:
@@ -294,7 +452,9 @@ class CarfaxAPIScraper:
 
 async def scrape_with_api(
     vins: list[str],
-    token_manager: TokenManager
+    token_manager: TokenManager,
+    concurrency: int = 8,
+    verbose: bool = False
 ) -> list[VehicleReport]:
     """
     دالة مساعدة للسحب باستخدام API
@@ -302,15 +462,20 @@ async def scrape_with_api(
     Args:
         vins: قائمة أرقام VIN
         token_manager: مدير الـ tokens
+        concurrency: عدد الطلبات المتزامنة
+        verbose: طباعة رسائل التصحيح
         
     Returns:
         قائمة التقارير
     """
-    scraper = CarfaxAPIScraper(token_manager)
+    scraper = CarfaxAPIScraper(token_manager, concurrency=concurrency, verbose=verbose)
     reports = []
     
-    async for report in scraper.get_reports(vins):
-        reports.append(report)
+    try:
+        async for report in scraper.get_reports(vins):
+            reports.append(report)
+    finally:
+        await shutdown_clients()
     
     return reports
 
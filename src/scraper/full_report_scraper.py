@@ -5,26 +5,318 @@ Full CARFAX Report Scraper
 """
 
 import asyncio
+import csv
 import json
 import re
-import os
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field, asdict, is_dataclass
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 
 from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
-from rich.console import Console
 
+# orjson أسرع بكثير في التسلسل ويدعم الـ dataclasses مباشرة
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from ..log import console
 from ..config import (
     CARFAX_BASE_URL,
     USE_CHROME_PROFILE,
-    CHROME_USER_DATA_DIR,
-    CHROME_PROFILE,
+    CHROME_PROFILE_DIR,
+    DEBUG_HTML,
+)
+
+# selectolax (Lexbor) لاستخراج النص - أسرع بكثير من BeautifulSoup
+# BeautifulSoup يبقى كبديل إذا لم تكن selectolax مثبتة
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+    from bs4 import BeautifulSoup, SoupStrainer
+    
+    # بناء شجرة <body> فقط (الـ <head> مليء بـ scripts و JSON لا نحتاج نصها)
+    _BODY_STRAINER = SoupStrainer("body")
+    
+    # lxml (C) أسرع بكثير من html.parser - نرجع لـ html.parser إذا لم يكن مثبتاً
+    try:
+        import lxml  # noqa: F401
+        _BS_PARSER = "lxml"
+    except ImportError:
+        _BS_PARSER = "html.parser"
+
+# Hyperscan (اختياري) - مسح واحد للـ HTML يحدد أي الأنماط لها تطابق أصلاً
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+
+# ==========================================
+# أنماط الاستخراج (مُجمّعة مرة واحدة عند الاستيراد)
+# ==========================================
+
+# الأسعار - كل مفاتيح JSON في نمط واحد (مرور واحد على الـ HTML)
+_PRICE_KEY_RE = re.compile(
+    r'"(carfaxPrice|retailPrice|wholesalePrice|tradeInPrice|privatePartyPrice)"\s*:\s*"\$?([\d,]+)"',
+    re.IGNORECASE
+)
+_PRICE_KEY_COUNT = 5
+
+# المفاتيح التي نقرأها مباشرة من JSON الصفحة (__INITIAL_STATE__ / __NEXT_DATA__)
+_JSON_PRICE_KEYS = ("carfaxPrice", "retailPrice", "wholesalePrice", "tradeInPrice", "privatePartyPrice")
+_JSON_KEYS = frozenset(_JSON_PRICE_KEYS + ("lastReportedOdometer",))
+_JSON_NUMBER_RE = re.compile(r'^\$?\s*([\d,]+)$')
+
+# الأنماط البديلة (نصية) عند غياب مفتاح JSON
+_RETAIL_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'"value"\s*:\s*"\$?([\d,]+)"[^}]*"text"\s*:\s*"[^"]*Retail',  # Value with Retail label
+    r'(?:CARFAX\s+)?Retail\s+Value[:\s]*\$\s*([\d,]+)',
+    r'\$\s*([\d,]+)\s*(?:CARFAX\s+)?Retail',
+)]
+_WHOLESALE_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'"value"\s*:\s*"\$?([\d,]+)"[^}]*"text"\s*:\s*"[^"]*Wholesale',  # Value with Wholesale label
+    r'Wholesale\s+Value[:\s]*\$\s*([\d,]+)',
+    r'\$\s*([\d,]+)\s*Wholesale',
+)]
+_TRADE_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'"value"\s*:\s*"\$?([\d,]+)"[^}]*"text"\s*:\s*"[^"]*Trade[\s-]?In',  # Value with Trade-In label
+    r'Trade[\s-]?In\s+Value[:\s]*\$\s*([\d,]+)',
+    r'\$\s*([\d,]+)\s*Trade[\s-]?In',
+)]
+_PRIVATE_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'"value"\s*:\s*"\$?([\d,]+)"[^}]*"text"\s*:\s*"[^"]*Private\s+Party',  # Value with label
+    r'Private\s+Party\s+Value[:\s]*\$\s*([\d,]+)',
+    r'\$\s*([\d,]+)\s*Private\s+Party',
+)]
+_DOLLAR_RE = re.compile(r'\$\s*([\d,]+)')
+_DOLLAR_FALLBACK_WINDOW = 8000  # أول N حرف من النص المرئي
+
+# سجلات الخدمة
+_SERVICE_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'(\d+)\s*Service\s*(?:history\s*)?records?',
+    r'service.*?(\d+)\s*records?',
+)]
+
+# آخر قراءة عداد
+_ODOMETER_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'<strong>([\d,]+)</strong>\s*Last\s*reported\s*odometer',  # HTML format (الأكثر دقة)
+    r'>([\d,]+)</strong>\s*Last\s*reported',  # Simpler HTML format
+    r'([\d,]+)\s*Last\s*reported\s*odometer',
+    r'Last\s*reported\s*odometer\s*reading[:\s]*([\d,]+)',
+    r'"lastReportedOdometer"[:\s]*"?([\d,]+)',
+    r'lastOdometer[:\s]*"?([\d,]+)',
+    r'"text"\s*:\s*"<strong>([\d,]+)</strong>',  # JSON embedded HTML
+)]
+
+# معلومات المركبة
+_TITLE_SERIES_RE = re.compile(r'(\d{4})\s+([A-Z]+)\s+(\d+\s+SERIES\s+[A-Z0-9]+)', re.IGNORECASE)
+_TITLE_SIMPLE_RE = re.compile(r'(\d{4})\s+([A-Z]+)\s+([A-Z0-9\s]+?)(?:VIN|"|\n)', re.IGNORECASE)
+_MODEL_JUNK_RE = re.compile(r'["{}\[\]:,].*$')
+_ENGINE_RE = re.compile(r'(\d+\.\d+L\s*[A-Z0-9\s]+(?:DOHC|SOHC)?(?:\s*\d+V)?)', re.IGNORECASE)
+_DRIVE_RE = re.compile(r'(ALL WHEEL DRIVE|FRONT WHEEL DRIVE|REAR WHEEL DRIVE|4WD|AWD|FWD|RWD)', re.IGNORECASE)
+_BODY_TYPES = ('SEDAN', 'SUV', 'COUPE', 'TRUCK', 'VAN', 'WAGON', 'CONVERTIBLE', 'HATCHBACK', '4 DR', '2 DR')
+_FUEL_TYPES = (('GASOLINE', 'Gasoline'), ('DIESEL', 'Diesel'), ('ELECTRIC', 'Electric'), ('HYBRID', 'Hybrid'))
+
+# ملخص التقرير
+_OWNERS_RE = re.compile(r'(\d+)\s*Previous\s*owners?', re.IGNORECASE)
+_NO_ACCIDENTS_RE = re.compile(r'No\s*accidents?\s*(?:or\s*damage\s*)?reported', re.IGNORECASE)
+_ACCIDENTS_RE = re.compile(r'(\d+)\s*accidents?\s*reported', re.IGNORECASE)
+_LAST_STATE_RE = re.compile(r'Last\s*owned\s*in\s*([A-Za-z\s]+?)(?:\d|$)', re.IGNORECASE)
+
+# حالة العنوان
+_TITLE_GUARANTEED_RE = re.compile(r'Guaranteed\s*No\s*Problem', re.IGNORECASE)
+_TITLE_CLEAN_RE = re.compile(r'title.*?clean', re.IGNORECASE)
+_TITLE_SALVAGE_RE = re.compile(r'salvage.*?title|title.*?salvage', re.IGNORECASE)
+_TITLE_REBUILT_RE = re.compile(r'rebuilt.*?title|title.*?rebuilt', re.IGNORECASE)
+_TITLE_NO_ISSUES_RE = re.compile(r'No\s*(?:Issues\s*)?(?:Problem|Reported)', re.IGNORECASE)
+# مؤشرات "لا توجد مشاكل" في نمط واحد - اسم المجموعة يحدد الحقل
+_NO_ISSUES_RE = re.compile(
+    r'(?P<total_loss>No\s*total\s*loss)'
+    r'|(?P<structural_damage>No\s*structural\s*damage)'
+    r'|(?P<airbag_deployment>No\s*airbag\s*deployment)'
+    r'|(?P<odometer_status>No\s*indication\s*of\s*(?:an\s*)?odometer\s*rollback)',
+    re.IGNORECASE
 )
+_NO_ISSUES_VALUES = {
+    "total_loss": "No Issues Reported",
+    "structural_damage": "No Issues Reported",
+    "airbag_deployment": "No Issues Reported",
+    "odometer_status": "No Issues Indicated",
+}
+
+# الضمان والاستدعاءات
+_WARRANTY_EXPIRED_RE = re.compile(r'warranty\s*expired', re.IGNORECASE)
+_WARRANTY_ACTIVE_RE = re.compile(r'warranty.*active', re.IGNORECASE)
+_NO_RECALLS_RE = re.compile(r'No\s*(?:open\s*)?recalls?\s*reported', re.IGNORECASE)
+
+# تاريخ الملاك
+_OWNER_HEADING_RE = re.compile(r'Owner\s*(\d+)', re.IGNORECASE)
+_MAX_OWNERS = 9
+_YEAR_PURCHASED_RE = re.compile(r'(?:Year\s*)?purchased[:\s]*(\d{4})', re.IGNORECASE)
+_LENGTH_RE = re.compile(r'(\d+\s*(?:years?|yrs?)\.?\s*\d*\s*(?:months?|mo\.?)?)', re.IGNORECASE)
+_MILES_YR_RE = re.compile(r'([\d,]+)\s*(?:per\s*year|/yr)', re.IGNORECASE)
+
+# السجل التفصيلي
+_DATE_RE = re.compile(r'(\d{2}/\d{2}/\d{4})')
+_CONTEXT_MILEAGE_RE = re.compile(r'([\d,]+)\s*(?:miles?)?')
+_EVENT_KEYWORDS = tuple((keyword, keyword.lower()) for keyword in (
+    'Vehicle serviced', 'Oil and filter changed', 'Title issued',
+    'Registration', 'Inspection', 'Brake', 'Tire', 'Battery',
+    'Sold', 'Offered for sale', 'Certified Pre-Owned'
+))
+
+
+class _Prefilter:
+    """
+    فلتر مسبق بـ Hyperscan لأنماط الـ HTML
+    
+    Hyperscan لا يعيد المجموعات (groups)، لذلك يُستخدم فقط لمعرفة أي الأنماط
+    لها تطابق في الصفحة (مرور واحد)، ثم re يستخرج القيمة للأنماط المتطابقة فقط.
+    بدون hyperscan (أو عند أي خطأ) كل الأنماط تُعتبر محتملة.
+    """
+    
+    def __init__(self, patterns: List[re.Pattern]):
+        self._ids: Dict[re.Pattern, int] = {}
+        self._db = None
+        if hyperscan is None:
+            return
+        
+        expressions, ids, flags = [], [], []
+        for pattern in patterns:
+            expression = pattern.pattern.encode()
+            pattern_flags = hyperscan.HS_FLAG_PREFILTER | hyperscan.HS_FLAG_SINGLEMATCH
+            if not pattern.flags & re.ASCII:
+                # أنماط re على str تعامل \d و \s كـ Unicode - نفس الدلالة على UTF-8
+                # حتى لا يرفض الفلتر صفحة يطابقها re (مسافة غير منقسمة، أرقام غير ASCII)
+                pattern_flags |= hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP
+            if pattern.flags & re.IGNORECASE:
+                pattern_flags |= hyperscan.HS_FLAG_CASELESS
+            if pattern.flags & re.DOTALL:
+                pattern_flags |= hyperscan.HS_FLAG_DOTALL
+            # تخطي الأنماط التي لا يدعمها Hyperscan (تبقى على re فقط)
+            try:
+                hyperscan.Database().compile(expressions=[expression], flags=[pattern_flags])
+            except hyperscan.error:
+                continue
+            self._ids[pattern] = len(expressions)
+            ids.append(len(expressions))
+            expressions.append(expression)
+            flags.append(pattern_flags)
+        
+        if expressions:
+            try:
+                db = hyperscan.Database()
+                db.compile(expressions=expressions, ids=ids, elements=len(expressions), flags=flags)
+                self._db = db
+            except hyperscan.error:
+                self._ids = {}
+    
+    def searcher(self, html: str):
+        """دالة search(pattern) على html تتخطى الأنماط التي لا تطابق"""
+        hits = None
+        if self._db is not None:
+            matched = set()
+            
+            def on_match(pattern_id, start, end, flags, context):
+                matched.add(pattern_id)
+            
+            try:
+                self._db.scan(html.encode("utf-8", "ignore"), match_event_handler=on_match)
+                hits = matched
+            except hyperscan.error:
+                hits = None
+        
+        ids = self._ids
+        
+        def search(pattern: re.Pattern):
+            if hits is not None:
+                pattern_id = ids.get(pattern)
+                if pattern_id is not None and pattern_id not in hits:
+                    return None
+            return pattern.search(html)
+        
+        return search
+
+
+_HTML_PREFILTER = _Prefilter(
+    _RETAIL_PATTERNS + _WHOLESALE_PATTERNS + _TRADE_PATTERNS + _PRIVATE_PATTERNS
+    + _SERVICE_PATTERNS + _ODOMETER_PATTERNS
+    + [
+        _TITLE_SERIES_RE, _TITLE_SIMPLE_RE, _ENGINE_RE, _DRIVE_RE,
+        _OWNERS_RE, _NO_ACCIDENTS_RE, _ACCIDENTS_RE, _LAST_STATE_RE,
+        _TITLE_GUARANTEED_RE, _TITLE_CLEAN_RE, _TITLE_SALVAGE_RE,
+        _TITLE_REBUILT_RE, _TITLE_NO_ISSUES_RE,
+        _WARRANTY_EXPIRED_RE, _WARRANTY_ACTIVE_RE, _NO_RECALLS_RE,
+    ]
+)
+
+
+def _walk_json(obj: Any, keys: frozenset) -> Dict[str, str]:
+    """
+    البحث عن مفاتيح في JSON متداخل (stack بدلاً من recursion)
+    
+    Returns:
+        أول قيمة رقمية لكل مفتاح (بصيغة "12,345" مثل أنماط الـ regex)
+    """
+    found: Dict[str, str] = {}
+    stack = [obj]
+    while stack and len(found) < len(keys):
+        node = stack.pop()
+        if isinstance(node, dict):
+            children = []
+            for key, value in node.items():
+                if isinstance(value, (dict, list)):
+                    children.append(value)
+                elif key in keys and key not in found:
+                    number = _json_number(value)
+                    if number:
+                        found[key] = number
+            # بالعكس حتى تُزار العناصر بترتيب ظهورها
+            stack.extend(reversed(children))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+    return found
+
 
-console = Console()
+def _json_number(value: Any) -> Optional[str]:
+    """تحويل قيمة JSON ("$12,345" أو 12345) إلى "12,345" """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return f"{int(value):,}"
+    if isinstance(value, str):
+        match = _JSON_NUMBER_RE.match(value.strip())
+        if match:
+            return match.group(1)
+    return None
+
+
+def _html_to_text(html: str) -> str:
+    """استخراج النص المرئي من HTML (مثل get_text(" ", strip=True))"""
+    if LexborHTMLParser is not None:
+        tree = LexborHTMLParser(html)
+        tree.strip_tags(["script", "style", "noscript", "template"])
+        node = tree.body or tree.root
+        if node is None:
+            return ""
+        return " ".join(node.text(separator=" ", strip=True).split())
+    
+    soup = BeautifulSoup(html, _BS_PARSER, parse_only=_BODY_STRAINER)
+    text = soup.get_text(" ", strip=True)
+    if not text:
+        # جزء HTML بدون <body> - تحليل كامل
+        text = BeautifulSoup(html, _BS_PARSER).get_text(" ", strip=True)
+    return text
+
+
+def _json_default(obj: Any) -> Any:
+    """تحويل الـ dataclasses أثناء json.dumps (بدون نسخ)"""
+    if is_dataclass(obj):
+        return obj.__dict__
+    return str(obj)
 
 
 @dataclass
@@ -102,21 +394,29 @@ class FullCarfaxReport:
         """تحويل إلى قاموس"""
         return asdict(self)
     
-    def to_json(self, filepath: str = None) -> str:
-        """تصدير إلى JSON"""
-        data = self.to_dict()
-        json_str = json.dumps(data, ensure_ascii=False, indent=2)
+    def to_json(self, filepath: str = None, mkdir: bool = True) -> str:
+        """تصدير إلى JSON (mkdir=False إذا كان المجلد موجوداً مسبقاً)"""
+        # التسلسل مباشرة من الكائن (بدون نسخة asdict العميقة للقوائم المتداخلة)
+        if orjson is not None:
+            data = orjson.dumps(
+                self,
+                default=str,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_DATACLASS
+            )
+        else:
+            data = json.dumps(self, ensure_ascii=False, indent=2, default=_json_default).encode("utf-8")
         
         if filepath:
-            Path(filepath).parent.mkdir(parents=True, exist_ok=True)
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(json_str)
-            console.print(f"[green]✓ تم حفظ JSON: {filepath}[/green]")
+            path = Path(filepath)
+            if mkdir:
+                path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+            console.print(f"[green]✓ تم حفظ JSON: {path}[/green]")
         
-        return json_str
+        return data.decode("utf-8")
     
-    def to_csv_row(self) -> Dict[str, str]:
-        """تحويل إلى صف CSV (البيانات الأساسية فقط)"""
+    def to_arrow_row_dict(self) -> Dict[str, Any]:
+        """تحويل إلى صف بأنواع بدائية (الأرقام تبقى int) - لـ Parquet/Arrow"""
         return {
             "vin": self.vin,
             "year": self.year,
@@ -131,9 +431,9 @@ class FullCarfaxReport:
             "wholesale_value": self.wholesale_value,
             "trade_in_value": self.trade_in_value,
             "private_party_value": self.private_party_value,
-            "total_owners": str(self.total_owners),
-            "accidents_reported": str(self.accidents_reported),
-            "service_records_count": str(self.service_records_count),
+            "total_owners": self.total_owners,
+            "accidents_reported": self.accidents_reported,
+            "service_records_count": self.service_records_count,
             "last_odometer": self.last_odometer,
             "last_state": self.last_state,
             "title_status": self.title_status,
@@ -146,17 +446,174 @@ class FullCarfaxReport:
             "report_date": self.report_date,
             "error": self.error
         }
+    
+    def to_csv_row(self) -> Dict[str, str]:
+        """تحويل إلى صف CSV (البيانات الأساسية فقط)"""
+        return {
+            key: value if isinstance(value, str) else str(value)
+            for key, value in self.to_arrow_row_dict().items()
+        }
+
+
+def export_parquet(reports: List[FullCarfaxReport], filepath: str) -> Optional[Path]:
+    """
+    تصدير دفعة تقارير إلى ملف Parquet واحد (zstd)
+    
+    Returns:
+        مسار الملف، أو None إذا لم تكن pyarrow مثبتة
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        console.print("[yellow]⚠ pyarrow غير مثبتة - pip install pyarrow[/yellow]")
+        return None
+    
+    path = Path(filepath)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    
+    table = pa.Table.from_pylist([r.to_arrow_row_dict() for r in reports])
+    pq.write_table(table, path, compression="zstd")
+    
+    console.print(f"[green]✓ تم حفظ Parquet: {path} ({len(reports)} تقرير)[/green]")
+    return path
+
+
+# امتدادات الموارد المحجوبة في الوضع السريع
+_BLOCKED_RESOURCES_GLOB = "**/*.{png,jpg,jpeg,gif,webp,svg,ico,woff,woff2,ttf,otf,mp4,webm}"
+
+
+class BrowserPool:
+    """
+    متصفح Playwright مشترك داخل نفس العملية
+    
+    يُطلق عند أول استخدام ويُعاد استخدامه في كل الاستدعاءات التالية
+    (يُعاد الإطلاق فقط إذا تغيّر fast_mode أو الـ event loop)
+    """
+    
+    _instance: Optional["BrowserPool"] = None
+    
+    def __init__(self):
+        self._playwright = None
+        self._context = None
+        self._fast_mode: Optional[bool] = None
+        self._loop = None
+        self._lock: Optional[asyncio.Lock] = None
+    
+    @classmethod
+    def instance(cls) -> "BrowserPool":
+        """النسخة الوحيدة المشتركة"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+    
+    async def get_context(self, fast_mode: bool = False):
+        """الحصول على الـ context المشترك (إطلاقه عند الحاجة)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # كائنات Playwright مرتبطة بالـ loop الذي أنشأها - لا يمكن إعادة استخدامها
+            self._playwright = None
+            self._context = None
+            self._loop = loop
+            self._lock = asyncio.Lock()
+        
+        async with self._lock:
+            if self._context is not None and self._fast_mode != fast_mode:
+                await self._close_context()
+            
+            if self._context is None:
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                self._context = await self._launch(self._playwright, fast_mode)
+                self._fast_mode = fast_mode
+                # إذا أُغلق المتصفح (يدوياً أو بسبب crash) نُطلقه من جديد في المرة القادمة
+                self._context.on("close", self._on_context_closed)
+            
+            return self._context
+    
+    def _on_context_closed(self, context) -> None:
+        if self._context is context:
+            self._context = None
+    
+    async def _close_context(self) -> None:
+        context, self._context = self._context, None
+        if context is not None:
+            try:
+                browser = context.browser
+                await context.close()
+                # بدون Chrome Profile: المتصفح نفسه يبقى مفتوحاً بعد إغلاق الـ context
+                if browser is not None:
+                    await browser.close()
+            except Exception:
+                pass
+    
+    async def close(self) -> None:
+        """إغلاق المتصفح و Playwright"""
+        if self._loop is not asyncio.get_running_loop():
+            return
+        await self._close_context()
+        playwright, self._playwright = self._playwright, None
+        if playwright is not None:
+            await playwright.stop()
+    
+    @staticmethod
+    async def _launch(p, fast_mode: bool):
+        """إطلاق المتصفح وإرجاع الـ context"""
+        # إطلاق المتصفح مع Chrome Profile
+        use_headless = fast_mode  # استخدام headless في الوضع السريع
+        
+        # في الوضع السريع: حجب الصور والخطوط على مستوى المتصفح (بدون المرور بـ Python)
+        fast_args = [
+            "--blink-settings=imagesEnabled=false",
+            "--disable-remote-fonts",
+            "--disable-features=MediaRouter",
+            "--disable-extensions",
+        ] if fast_mode else []
+        
+        if USE_CHROME_PROFILE:
+            console.print("[cyan]  🌐 استخدام Chrome Profile[/cyan]")
+            context = await p.chromium.launch_persistent_context(
+                user_data_dir=CHROME_PROFILE_DIR,
+                channel="chrome",
+                headless=use_headless,
+                viewport={"width": 1920, "height": 1080},
+                args=[
+                    "--disable-blink-features=AutomationControlled",
+                    "--disable-dev-shm-usage",
+                    "--no-sandbox",
+                    "--disable-gpu" if use_headless else "",
+                ] + fast_args
+            )
+        else:
+            browser = await p.chromium.launch(headless=use_headless, args=fast_args)
+            context = await browser.new_context(viewport={"width": 1920, "height": 1080})
+        
+        # ما تبقى (فيديو، خطوط محلية) يُحجب بنمط URL فقط - الطلبات الأخرى
+        # لا تمر بـ Python إطلاقاً. لا نحجب CSS/JS لأنها قد تكون مطلوبة لعرض البيانات
+        if fast_mode:
+            await context.route(_BLOCKED_RESOURCES_GLOB, lambda route: route.abort())
+        
+        return context
+
+
+async def shutdown_browser() -> None:
+    """إغلاق المتصفح المشترك (عند خروج البرنامج)"""
+    if BrowserPool._instance is not None:
+        await BrowserPool._instance.close()
 
 
 class FullReportScraper:
     """
     Scraper شامل لاستخراج كل بيانات تقرير CARFAX
     
-    يستخدم Playwright للوصول للصفحة و BeautifulSoup للتحليل
+    يستخدم Playwright للوصول للصفحة و selectolax (أو BeautifulSoup) للتحليل
     """
     
     def __init__(self):
         self.report = None
+        # مجلد ملفات HTML للتصحيح (يُنشأ مرة واحدة عند أول حفظ)
+        self._debug_dir = Path("data")
+        self._debug_dir_ready = False
     
     async def scrape_report(self, vin: str, get_wholesale: bool = True, fast_mode: bool = False) -> FullCarfaxReport:
         """
@@ -170,48 +627,91 @@ class FullReportScraper:
         Returns:
             تقرير CARFAX الكامل
         """
-        console.print(f"[blue]🔍 جاري سحب التقرير الكامل لـ: {vin}[/blue]")
+        reports = await self.scrape_many([vin], get_wholesale, fast_mode, concurrency=1)
+        return reports[0]
+    
+    async def scrape_many(
+        self,
+        vins: List[str],
+        get_wholesale: bool = True,
+        fast_mode: bool = False,
+        concurrency: int = 8
+    ) -> List[FullCarfaxReport]:
+        """
+        سحب تقارير متعددة بمتصفح واحد (صفحة جديدة لكل VIN)
+        
+        Args:
+            vins: قائمة أرقام VIN
+            get_wholesale: هل نحاول الحصول على سعر الـ Wholesale
+            fast_mode: وضع سريع (بدون حفظ debug files)
+            concurrency: عدد الصفحات المفتوحة في نفس الوقت
+            
+        Returns:
+            التقارير بنفس ترتيب vins
+        """
         if fast_mode:
             console.print("[yellow]  ⚡ الوضع السريع[/yellow]")
         
+        try:
+            # المتصفح مشترك بين الاستدعاءات - فقط الصفحات تُفتح وتُغلق لكل VIN
+            context = await BrowserPool.instance().get_context(fast_mode)
+            sem = asyncio.Semaphore(max(1, concurrency))
+            results = await asyncio.gather(
+                *(self._scrape_one(context, vin, sem, fast_mode) for vin in vins),
+                return_exceptions=True
+            )
+            
+            # فشل VIN واحد يصبح تقرير خطأ له فقط (بقية التقارير تبقى)
+            reports = []
+            for vin, result in zip(vins, results):
+                if isinstance(result, Exception):
+                    console.print(f"[red]✗ خطأ ({vin}): {result}[/red]")
+                    result = FullCarfaxReport(
+                        vin=vin,
+                        report_date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                        error=str(result)
+                    )
+                elif isinstance(result, BaseException):
+                    raise result
+                reports.append(result)
+            return reports
+                
+        except Exception as e:
+            console.print(f"[red]✗ خطأ: {e}[/red]")
+            report_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            return [FullCarfaxReport(vin=vin, report_date=report_date, error=str(e)) for vin in vins]
+    
+    async def _scrape_one(self, context, vin: str, sem: asyncio.Semaphore, fast_mode: bool) -> FullCarfaxReport:
+        """سحب تقرير واحد في صفحة جديدة داخل الـ context المشترك"""
         report = FullCarfaxReport(vin=vin, report_date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
         
-        try:
-            async with async_playwright() as p:
-                # إطلاق المتصفح مع Chrome Profile
-                use_headless = fast_mode  # استخدام headless في الوضع السريع
+        async with sem:
+            console.print(f"[blue]🔍 جاري سحب التقرير الكامل لـ: {vin}[/blue]")
+            page = None
+            
+            try:
+                page = await context.new_page()
                 
-                if USE_CHROME_PROFILE:
-                    console.print("[cyan]  🌐 استخدام Chrome Profile[/cyan]")
-                    context = await p.chromium.launch_persistent_context(
-                        user_data_dir=os.path.join(CHROME_USER_DATA_DIR, CHROME_PROFILE),
-                        channel="chrome",
-                        headless=use_headless,
-                        viewport={"width": 1920, "height": 1080},
-                        args=[
-                            "--disable-blink-features=AutomationControlled",
-                            "--disable-dev-shm-usage",
-                            "--no-sandbox",
-                            "--disable-gpu" if use_headless else "",
-                            "--disable-images" if fast_mode else "",  # تعطيل الصور في الوضع السريع
-                        ] + (["--disable-extensions"] if fast_mode else [])
-                    )
-                    page = context.pages[0] if context.pages else await context.new_page()
-                else:
-                    browser = await p.chromium.launch(headless=use_headless)
-                    context = await browser.new_context(viewport={"width": 1920, "height": 1080})
-                    page = await context.new_page()
+                # التقاط JSON التقرير من الشبكة مباشرة (طلب XHR الخاص بـ vhr)
+                json_future = asyncio.get_running_loop().create_future()
+                
+                async def on_response(response):
+                    if json_future.done():
+                        return
+                    if response.request.resource_type not in ("xhr", "fetch"):
+                        return
+                    if "vhr" not in response.url.lower():
+                        return
+                    if "json" not in response.headers.get("content-type", ""):
+                        return
+                    try:
+                        data = await response.json()
+                    except:
+                        return
+                    if not json_future.done():
+                        json_future.set_result(data)
                 
-                # في الوضع السريع: حجب الموارد غير الضرورية (صور، خطوط، فيديو)
-                # لا نحجب CSS/JS لأنها قد تكون مطلوبة لعرض البيانات
-                if fast_mode:
-                    async def route_handler(route):
-                        resource_type = route.request.resource_type
-                        if resource_type in ["image", "font", "media"]:
-                            await route.abort()
-                        else:
-                            await route.continue_()
-                    await context.route("**/*", route_handler)
+                page.on("response", on_response)
                 
                 # الذهاب مباشرة لصفحة التقرير
                 report_url = f"{CARFAX_BASE_URL}/vhr/{vin}"
@@ -221,69 +721,79 @@ class FullReportScraper:
                 await page.goto(report_url, wait_until="domcontentloaded", timeout=20000)
                 
                 # انتظار تحميل البيانات المهمة (JSON المضمن)
+                vin_selector = f"text={vin}"
+                vin_ready = False
                 try:
-                    # انتظار وجود VIN أو wholesalePrice في الصفحة (أسرع من networkidle)
-                    await page.wait_for_function(
-                        f'() => document.body && (document.body.innerText.includes("{vin}") || document.body.innerHTML.includes("wholesalePrice"))',
-                        timeout=8000
-                    )
+                    # انتظار ظهور عنصر يحتوي VIN (يُطلق عند تغيّر الـ DOM بدلاً من
+                    # فحص innerText/innerHTML الكامل في كل frame)
+                    await page.wait_for_selector(vin_selector, state="attached", timeout=8000)
+                    vin_ready = True
                 except:
-                    # إذا لم ينجح، ننتظر قليلاً فقط
-                    await asyncio.sleep(0.8)
+                    # إذا لم ينجح ولم يصل JSON من الشبكة، ننتظر قليلاً فقط
+                    if not json_future.done():
+                        await asyncio.sleep(0.8)
                 
-                # محاولة استخراج JSON مباشرة من JavaScript (أسرع)
-                json_data = None
-                try:
-                    json_data = await page.evaluate("""
-                        () => {
-                            // البحث عن window.__INITIAL_STATE__ أو بيانات مشابهة
-                            if (window.__INITIAL_STATE__) return window.__INITIAL_STATE__;
-                            if (window.__NEXT_DATA__) return window.__NEXT_DATA__;
-                            // البحث في script tags
-                            const scripts = document.querySelectorAll('script[type="application/json"]');
-                            for (let script of scripts) {
-                                try {
-                                    return JSON.parse(script.textContent);
-                                } catch(e) {}
+                json_data = json_future.result() if json_future.done() else None
+                
+                # إذا لم يصل JSON من الشبكة: استخراجه مباشرة من JavaScript
+                if json_data is None:
+                    try:
+                        json_data = await page.evaluate("""
+                            () => {
+                                // البحث عن window.__INITIAL_STATE__ أو بيانات مشابهة
+                                if (window.__INITIAL_STATE__) return window.__INITIAL_STATE__;
+                                if (window.__NEXT_DATA__) return window.__NEXT_DATA__;
+                                // البحث في script tags
+                                const scripts = document.querySelectorAll('script[type="application/json"]');
+                                for (let script of scripts) {
+                                    try {
+                                        return JSON.parse(script.textContent);
+                                    } catch(e) {}
+                                }
+                                return null;
                             }
-                            return null;
-                        }
-                    """)
-                except:
-                    pass
+                        """)
+                    except:
+                        pass
+                
+                # إذا لم تظهر البيانات بعد: فرصة أخيرة قصيرة قبل قراءة الـ HTML
+                # (page.content() يسلسل الـ DOM كاملاً - نستدعيه مرة واحدة فقط)
+                if not json_data and not vin_ready:
+                    console.print("[yellow]  ⚠ انتظار تحميل البيانات...[/yellow]")
+                    try:
+                        await page.wait_for_selector(vin_selector, state="attached", timeout=1000)
+                    except:
+                        pass
                 
                 # الحصول على HTML
                 html = await page.content()
                 
-                # إذا حصلنا على JSON مباشرة، نضيفه للـ HTML لاستخراجه لاحقاً
-                if json_data:
-                    html += f"\n<!-- JSON_DATA: {json.dumps(json_data)} -->"
-                
-                # التحقق من وجود VIN أو wholesalePrice في الصفحة
-                if vin not in html and 'wholesalePrice' not in html:
-                    console.print("[yellow]  ⚠ انتظار تحميل البيانات...[/yellow]")
-                    await asyncio.sleep(1)  # تقليل من 2 إلى 1 ثانية
-                    html = await page.content()
-                
                 # لا حاجة للنقر - الأسعار موجودة في JSON المضمن في HTML
                 
-                # حفظ HTML للتصحيح (في الوضع العادي فقط)
-                if not fast_mode:
-                    debug_file = Path(f"data/full_report_{vin}.html")
-                    debug_file.parent.mkdir(exist_ok=True)
-                    with open(debug_file, "w", encoding="utf-8") as f:
-                        f.write(html)
+                # حفظ HTML للتصحيح (عند تفعيل DEBUG_HTML وفي الوضع العادي فقط)
+                if DEBUG_HTML and not fast_mode:
+                    if not self._debug_dir_ready:
+                        self._debug_dir.mkdir(exist_ok=True)
+                        self._debug_dir_ready = True
+                    debug_file = self._debug_dir / f"full_report_{vin}.html"
+                    # الكتابة في thread حتى لا تُوقف الـ event loop أثناء سحب الدفعات
+                    await asyncio.to_thread(debug_file.write_text, html, encoding="utf-8")
                     console.print(f"[dim]  تم حفظ HTML: {debug_file}[/dim]")
                 
                 # استخراج البيانات
-                report = self._extract_full_report(vin, html)
+                # JSON يُمرر كما هو (بدلاً من تضمينه في HTML ثم البحث فيه بـ regex)
+                report = self._extract_full_report(vin, html, json_data)
                 
-                # إغلاق المتصفح
-                await context.close()
-                
-        except Exception as e:
-            console.print(f"[red]✗ خطأ: {e}[/red]")
-            report.error = str(e)
+            except Exception as e:
+                console.print(f"[red]✗ خطأ ({vin}): {e}[/red]")
+                report.error = str(e)
+            finally:
+                # فشل الإغلاق (متصفح انهار) لا يُسقط التقارير الأخرى في gather
+                if page is not None:
+                    try:
+                        await page.close()
+                    except:
+                        pass
         
         return report
     
@@ -358,7 +868,14 @@ class FullReportScraper:
             console.print(f"[dim]  ⚠ لم يتم العثور على أزرار الأسعار: {e}[/dim]")
             return False
     
-    def _extract_all_prices(self, report: FullCarfaxReport, html: str, text: str) -> None:
+    def _extract_all_prices(
+        self,
+        report: FullCarfaxReport,
+        html: str,
+        text: str,
+        json_values: Optional[Dict[str, str]] = None,
+        search=None
+    ) -> None:
         """
         استخراج جميع أنواع الأسعار من الصفحة
         
@@ -366,65 +883,52 @@ class FullReportScraper:
             report: كائن التقرير لتحديثه
             html: الـ HTML الخام
             text: النص المستخرج
+            json_values: القيم المقروءة من JSON الصفحة (_walk_json)
+            search: دالة البحث في الـ HTML (_Prefilter.searcher)
         """
+        if search is None:
+            search = _HTML_PREFILTER.searcher(html)
+        
+        # الأسعار الموجودة في JSON الصفحة أولاً
+        prices: Dict[str, str] = {
+            key.lower(): value
+            for key, value in (json_values or {}).items()
+            if key in _JSON_PRICE_KEYS
+        }
+        
+        # مفاتيح الأسعار في JSON المضمن في HTML - مرور واحد (أول قيمة لكل مفتاح)
+        if len(prices) < _PRICE_KEY_COUNT:
+            for match in _PRICE_KEY_RE.finditer(html):
+                prices.setdefault(match.group(1).lower(), match.group(2))
+                if len(prices) == _PRICE_KEY_COUNT:
+                    break
+        
         # 1. Retail Value (السعر الأساسي) - من JSON المضمن
-        retail_patterns = [
-            r'"carfaxPrice"\s*:\s*"\$?([\d,]+)"',  # JSON format
-            r'"retailPrice"\s*:\s*"\$?([\d,]+)"',  # Alternative JSON
-            r'"value"\s*:\s*"\$?([\d,]+)"[^}]*"text"\s*:\s*"[^"]*Retail',  # Value with Retail label
-            r'(?:CARFAX\s+)?Retail\s+Value[:\s]*\$\s*([\d,]+)',
-            r'\$\s*([\d,]+)\s*(?:CARFAX\s+)?Retail',
-        ]
-        for pattern in retail_patterns:
-            match = re.search(pattern, html, re.IGNORECASE)
-            if match:
-                report.retail_value = f"${match.group(1)}"
-                break
+        report.retail_value = self._first_price(
+            prices, ("carfaxprice", "retailprice"), _RETAIL_PATTERNS, search
+        )
         
-        # إذا لم نجد بنمط محدد، نبحث عن أول سعر
+        # إذا لم نجد بنمط محدد، نبحث عن أول سعر في بداية النص المرئي فقط
+        # (ملخص التقرير) بدلاً من كل الـ HTML - أسرع ويتجنب أسعار الإعلانات والـ footer
         if not report.retail_value:
-            simple_match = re.search(r'\$\s*([\d,]+)', html)
+            simple_match = _DOLLAR_RE.search(text, 0, _DOLLAR_FALLBACK_WINDOW)
             if simple_match:
                 report.retail_value = f"${simple_match.group(1)}"
         
         # 2. Wholesale Value (سعر الجملة) - من JSON المضمن
-        wholesale_patterns = [
-            r'"wholesalePrice"\s*:\s*"\$?([\d,]+)"',  # JSON format (الأكثر دقة)
-            r'"value"\s*:\s*"\$?([\d,]+)"[^}]*"text"\s*:\s*"[^"]*Wholesale',  # Value with Wholesale label
-            r'Wholesale\s+Value[:\s]*\$\s*([\d,]+)',
-            r'\$\s*([\d,]+)\s*Wholesale',
-        ]
-        for pattern in wholesale_patterns:
-            match = re.search(pattern, html, re.IGNORECASE)
-            if match:
-                report.wholesale_value = f"${match.group(1)}"
-                break
+        report.wholesale_value = self._first_price(
+            prices, ("wholesaleprice",), _WHOLESALE_PATTERNS, search
+        )
         
         # 3. Trade-In Value (قيمة الاستبدال)
-        trade_patterns = [
-            r'"tradeInPrice"\s*:\s*"\$?([\d,]+)"',  # JSON format
-            r'"value"\s*:\s*"\$?([\d,]+)"[^}]*"text"\s*:\s*"[^"]*Trade[\s-]?In',  # Value with Trade-In label
-            r'Trade[\s-]?In\s+Value[:\s]*\$\s*([\d,]+)',
-            r'\$\s*([\d,]+)\s*Trade[\s-]?In',
-        ]
-        for pattern in trade_patterns:
-            match = re.search(pattern, html, re.IGNORECASE)
-            if match:
-                report.trade_in_value = f"${match.group(1)}"
-                break
+        report.trade_in_value = self._first_price(
+            prices, ("tradeinprice",), _TRADE_PATTERNS, search
+        )
         
         # 4. Private Party Value (البيع الخاص)
-        private_patterns = [
-            r'"privatePartyPrice"\s*:\s*"\$?([\d,]+)"',  # JSON format
-            r'"value"\s*:\s*"\$?([\d,]+)"[^}]*"text"\s*:\s*"[^"]*Private\s+Party',  # Value with label
-            r'Private\s+Party\s+Value[:\s]*\$\s*([\d,]+)',
-            r'\$\s*([\d,]+)\s*Private\s+Party',
-        ]
-        for pattern in private_patterns:
-            match = re.search(pattern, html, re.IGNORECASE)
-            if match:
-                report.private_party_value = f"${match.group(1)}"
-                break
+        report.private_party_value = self._first_price(
+            prices, ("privatepartyprice",), _PRIVATE_PATTERNS, search
+        )
         
         # طباعة الأسعار المستخرجة
         console.print(f"[dim]    💰 Retail: {report.retail_value or 'N/A'}[/dim]")
@@ -435,12 +939,29 @@ class FullReportScraper:
         if report.private_party_value:
             console.print(f"[dim]    👤 Private Party: {report.private_party_value}[/dim]")
     
-    def _extract_full_report(self, vin: str, html: str) -> FullCarfaxReport:
-        """استخراج كل البيانات من HTML"""
+    @staticmethod
+    def _first_price(prices: Dict[str, str], keys: tuple, patterns: list, search) -> str:
+        """أول سعر من مفاتيح JSON حسب الأولوية، وإلا من الأنماط النصية"""
+        for key in keys:
+            if key in prices:
+                return f"${prices[key]}"
+        for pattern in patterns:
+            match = search(pattern)
+            if match:
+                return f"${match.group(1)}"
+        return ""
+    
+    def _extract_full_report(self, vin: str, html: str, json_data: Any = None) -> FullCarfaxReport:
+        """استخراج كل البيانات من HTML (و JSON الصفحة إن وجد)"""
         report = FullCarfaxReport(vin=vin, report_date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
         
-        soup = BeautifulSoup(html, 'html.parser')
-        text = soup.get_text(" ", strip=True)
+        text = _html_to_text(html)
+        
+        # المفاتيح المعروفة من JSON مباشرة - الـ regex فقط لما لم يوجد
+        json_values = _walk_json(json_data, _JSON_KEYS) if json_data else {}
+        
+        # مرور Hyperscan واحد (إن وجد) يحدد أي أنماط re تستحق التشغيل
+        search = _HTML_PREFILTER.searcher(html)
         
         console.print("[dim]  → استخراج البيانات...[/dim]")
         
@@ -449,47 +970,48 @@ class FullReportScraper:
         # ==========================================
         
         # استخراج السنة/الشركة/الموديل من عنوان الصفحة
-        title_match = re.search(r'(\d{4})\s+([A-Z]+)\s+(\d+\s+SERIES\s+[A-Z0-9]+)', html, re.IGNORECASE)
+        title_match = search(_TITLE_SERIES_RE)
         if title_match:
             report.year = title_match.group(1)
             report.make = title_match.group(2)
             report.model = title_match.group(3).strip()
         else:
             # محاولة ثانية - البحث عن نمط أبسط
-            title_match = re.search(r'(\d{4})\s+([A-Z]+)\s+([A-Z0-9\s]+?)(?:VIN|"|\n)', html, re.IGNORECASE)
+            title_match = search(_TITLE_SIMPLE_RE)
             if title_match:
                 report.year = title_match.group(1)
                 report.make = title_match.group(2)
                 model_part = title_match.group(3).strip()
                 # تنظيف النص من أي JSON
-                model_part = re.sub(r'["{}\[\]:,].*$', '', model_part).strip()
+                model_part = _MODEL_JUNK_RE.sub('', model_part).strip()
                 if len(model_part) < 50:  # تجنب النصوص الطويلة جداً
                     parts = model_part.split()
                     if parts:
                         report.model = parts[0]
                         report.trim = " ".join(parts[1:]) if len(parts) > 1 else ""
         
-        # نوع الهيكل
-        body_types = ['SEDAN', 'SUV', 'COUPE', 'TRUCK', 'VAN', 'WAGON', 'CONVERTIBLE', 'HATCHBACK', '4 DR', '2 DR']
-        for bt in body_types:
-            if bt in html.upper():
+        # نسخة uppercase واحدة لفحص الهيكل والوقود (بدلاً من نسخة لكل كلمة)
+        html_upper = html.upper()
+        
+        # نوع الهيكل (الترتيب = الأولوية)
+        for bt in _BODY_TYPES:
+            if bt in html_upper:
                 report.body_type = bt
                 break
         
         # المحرك
-        engine_match = re.search(r'(\d+\.\d+L\s*[A-Z0-9\s]+(?:DOHC|SOHC)?(?:\s*\d+V)?)', html, re.IGNORECASE)
+        engine_match = search(_ENGINE_RE)
         if engine_match:
             report.engine = engine_match.group(1).strip()
         
         # نوع الوقود
-        fuel_types = {'GASOLINE': 'Gasoline', 'DIESEL': 'Diesel', 'ELECTRIC': 'Electric', 'HYBRID': 'Hybrid'}
-        for key, val in fuel_types.items():
-            if key in html.upper():
+        for key, val in _FUEL_TYPES:
+            if key in html_upper:
                 report.fuel_type = val
                 break
         
         # نظام الدفع
-        drive_match = re.search(r'(ALL WHEEL DRIVE|FRONT WHEEL DRIVE|REAR WHEEL DRIVE|4WD|AWD|FWD|RWD)', html, re.IGNORECASE)
+        drive_match = search(_DRIVE_RE)
         if drive_match:
             report.drive_type = drive_match.group(1)
         
@@ -498,50 +1020,40 @@ class FullReportScraper:
         # ==========================================
         
         # استخراج جميع الأسعار (Retail, Wholesale, Trade-In, Private Party)
-        self._extract_all_prices(report, html, text)
+        self._extract_all_prices(report, html, text, json_values, search)
         
         # عدد الملاك
-        owners_match = re.search(r'(\d+)\s*Previous\s*owners?', html, re.IGNORECASE)
+        owners_match = search(_OWNERS_RE)
         if owners_match:
             report.total_owners = int(owners_match.group(1))
         
         # الحوادث
-        if re.search(r'No\s*accidents?\s*(?:or\s*damage\s*)?reported', html, re.IGNORECASE):
+        if search(_NO_ACCIDENTS_RE):
             report.accidents_reported = 0
         else:
-            accidents_match = re.search(r'(\d+)\s*accidents?\s*reported', html, re.IGNORECASE)
+            accidents_match = search(_ACCIDENTS_RE)
             if accidents_match:
                 report.accidents_reported = int(accidents_match.group(1))
         
         # سجلات الخدمة
-        service_patterns = [
-            r'(\d+)\s*Service\s*(?:history\s*)?records?',
-            r'service.*?(\d+)\s*records?',
-        ]
-        for pattern in service_patterns:
-            service_match = re.search(pattern, html, re.IGNORECASE)
+        for pattern in _SERVICE_PATTERNS:
+            service_match = search(pattern)
             if service_match:
                 report.service_records_count = int(service_match.group(1))
                 break
         
         # آخر قراءة عداد
-        odometer_patterns = [
-            r'<strong>([\d,]+)</strong>\s*Last\s*reported\s*odometer',  # HTML format (الأكثر دقة)
-            r'>([\d,]+)</strong>\s*Last\s*reported',  # Simpler HTML format
-            r'([\d,]+)\s*Last\s*reported\s*odometer',
-            r'Last\s*reported\s*odometer\s*reading[:\s]*([\d,]+)',
-            r'"lastReportedOdometer"[:\s]*"?([\d,]+)',
-            r'lastOdometer[:\s]*"?([\d,]+)',
-            r'"text"\s*:\s*"<strong>([\d,]+)</strong>',  # JSON embedded HTML
-        ]
-        for pattern in odometer_patterns:
-            odometer_match = re.search(pattern, html, re.IGNORECASE)
-            if odometer_match:
-                report.last_odometer = odometer_match.group(1)
-                break
+        if "lastReportedOdometer" in json_values:
+            report.last_odometer = json_values["lastReportedOdometer"]
+        else:
+            for pattern in _ODOMETER_PATTERNS:
+                odometer_match = search(pattern)
+                if odometer_match:
+                    report.last_odometer = odometer_match.group(1)
+                    break
         
         # آخر ولاية
-        state_match = re.search(r'Last\s*owned\s*in\s*([A-Za-z\s]+?)(?:\d|$)', html, re.IGNORECASE)
+        state_match = search(_LAST_STATE_RE)
         if state_match:
             report.last_state = state_match.group(1).strip()
         
@@ -551,63 +1063,67 @@ class FullReportScraper:
         
         # حالة العنوان - البحث عن النتيجة الفعلية
         # "Guaranteed No Problem" يعني العنوان نظيف
-        if re.search(r'Guaranteed\s*No\s*Problem', html, re.IGNORECASE):
+        if search(_TITLE_GUARANTEED_RE):
             report.title_status = "Clean"
-        elif re.search(r'title.*?clean', html, re.IGNORECASE):
+        elif search(_TITLE_CLEAN_RE):
             report.title_status = "Clean"
-        elif re.search(r'salvage.*?title|title.*?salvage', html, re.IGNORECASE):
+        elif search(_TITLE_SALVAGE_RE):
             report.title_status = "Salvage"
-        elif re.search(r'rebuilt.*?title|title.*?rebuilt', html, re.IGNORECASE):
+        elif search(_TITLE_REBUILT_RE):
             report.title_status = "Rebuilt"
         else:
             # إذا لم يتم الإبلاغ عن مشاكل في العنوان
-            if re.search(r'No\s*(?:Issues\s*)?(?:Problem|Reported)', html, re.IGNORECASE):
+            if search(_TITLE_NO_ISSUES_RE):
                 report.title_status = "Clean"
             else:
                 report.title_status = "Unknown"
         
-        # Total Loss
-        if re.search(r'No\s*total\s*loss', html, re.IGNORECASE):
-            report.total_loss = "No Issues Reported"
-        
-        # Structural Damage
-        if re.search(r'No\s*structural\s*damage', html, re.IGNORECASE):
-            report.structural_damage = "No Issues Reported"
-        
-        # Airbag Deployment
-        if re.search(r'No\s*airbag\s*deployment', html, re.IGNORECASE):
-            report.airbag_deployment = "No Issues Reported"
-        
-        # Odometer
-        if re.search(r'No\s*indication\s*of\s*(?:an\s*)?odometer\s*rollback', html, re.IGNORECASE):
-            report.odometer_status = "No Issues Indicated"
+        # Total Loss / Structural Damage / Airbag Deployment / Odometer - مرور واحد
+        found = set()
+        for match in _NO_ISSUES_RE.finditer(html):
+            field_name = match.lastgroup
+            if field_name not in found:
+                found.add(field_name)
+                setattr(report, field_name, _NO_ISSUES_VALUES[field_name])
+                if len(found) == len(_NO_ISSUES_VALUES):
+                    break
         
         # ==========================================
         # 4. الضمان والاستدعاءات
         # ==========================================
         
-        if re.search(r'warranty\s*expired', html, re.IGNORECASE):
+        if search(_WARRANTY_EXPIRED_RE):
             report.basic_warranty = "Expired"
-        elif re.search(r'warranty.*active', html, re.IGNORECASE):
+        elif search(_WARRANTY_ACTIVE_RE):
             report.basic_warranty = "Active"
         
-        if re.search(r'No\s*(?:open\s*)?recalls?\s*reported', html, re.IGNORECASE):
+        if search(_NO_RECALLS_RE):
             report.recalls = "No Recalls Reported"
         
         # ==========================================
         # 5. تاريخ الملاك
         # ==========================================
         
+        # مسح واحد لعناوين "Owner N" - كتلة كل مالك تمتد من أول ظهور لـ
+        # "Owner N" حتى أول "Owner N+1" بعده (أو نهاية النص)
+        headings = [(int(m.group(1)), m.start()) for m in _OWNER_HEADING_RE.finditer(text)]
+        first_heading: Dict[int, int] = {}
+        for number, position in headings:
+            first_heading.setdefault(number, position)
+        
         # البحث عن معلومات كل مالك
-        for i in range(1, 10):
-            owner_pattern = rf'Owner\s*{i}.*?(?:Owner\s*{i+1}|$)'
-            owner_match = re.search(owner_pattern, text, re.IGNORECASE | re.DOTALL)
-            if owner_match:
-                owner_text = owner_match.group(0)
+        for i in range(1, _MAX_OWNERS + 1):
+            start = first_heading.get(i)
+            if start is not None:
+                end = next(
+                    (position for number, position in headings if number == i + 1 and position > start),
+                    len(text)
+                )
+                owner_text = text[start:end]
                 owner = OwnerHistory(owner_number=i)
                 
                 # سنة الشراء
-                year_match = re.search(r'(?:Year\s*)?purchased[:\s]*(\d{4})', owner_text, re.IGNORECASE)
+                year_match = _YEAR_PURCHASED_RE.search(owner_text)
                 if year_match:
                     owner.year_purchased = year_match.group(1)
                 
@@ -620,12 +1136,12 @@ class FullReportScraper:
                     owner.owner_type = "Corporate"
                 
                 # مدة الملكية
-                length_match = re.search(r'(\d+\s*(?:years?|yrs?)\.?\s*\d*\s*(?:months?|mo\.?)?)', owner_text, re.IGNORECASE)
+                length_match = _LENGTH_RE.search(owner_text)
                 if length_match:
                     owner.length_of_ownership = length_match.group(1)
                 
                 # الأميال في السنة
-                miles_match = re.search(r'([\d,]+)\s*(?:per\s*year|/yr)', owner_text, re.IGNORECASE)
+                miles_match = _MILES_YR_RE.search(owner_text)
                 if miles_match:
                     owner.miles_per_year = miles_match.group(1)
                 
@@ -635,38 +1151,38 @@ class FullReportScraper:
         # 6. السجل التفصيلي
         # ==========================================
         
-        # استخراج جميع الأحداث المؤرخة
-        date_pattern = r'(\d{2}/\d{2}/\d{4})'
-        dates = re.findall(date_pattern, html)
+        # استخراج جميع الأحداث المؤرخة - مسح واحد للنص
+        # سياق كل تاريخ = من التاريخ حتى التاريخ التالي (أول ظهور فقط لكل تاريخ)
+        matches = list(_DATE_RE.finditer(text))
+        seen_dates = set()
         
-        for date in set(dates):
-            # البحث عن السياق حول كل تاريخ
-            context_pattern = rf'{date}.*?(?=\d{{2}}/\d{{2}}/\d{{4}}|$)'
-            context_match = re.search(context_pattern, text, re.DOTALL)
-            if context_match:
-                context = context_match.group(0)[:500]  # أول 500 حرف
-                
-                # استخراج المسافة
-                mileage_match = re.search(r'([\d,]+)\s*(?:miles?)?', context)
-                mileage = mileage_match.group(1) if mileage_match else ""
-                
-                # الأحداث الشائعة
-                events = []
-                event_keywords = [
-                    'Vehicle serviced', 'Oil and filter changed', 'Title issued',
-                    'Registration', 'Inspection', 'Brake', 'Tire', 'Battery',
-                    'Sold', 'Offered for sale', 'Certified Pre-Owned'
-                ]
-                for keyword in event_keywords:
-                    if keyword.lower() in context.lower():
-                        events.append(keyword)
-                
-                if events:
-                    report.detailed_history.append({
-                        "date": date,
-                        "mileage": mileage,
-                        "events": events
-                    })
+        for i, date_match in enumerate(matches):
+            date = date_match.group(1)
+            if date in seen_dates:
+                continue
+            seen_dates.add(date)
+            
+            start = date_match.start()
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+            context = text[start:min(end, start + 500)]  # أول 500 حرف
+            context_lower = context.lower()
+            
+            # استخراج المسافة
+            mileage_match = _CONTEXT_MILEAGE_RE.search(context)
+            mileage = mileage_match.group(1) if mileage_match else ""
+            
+            # الأحداث الشائعة
+            events = [
+                keyword for keyword, keyword_lower in _EVENT_KEYWORDS
+                if keyword_lower in context_lower
+            ]
+            
+            if events:
+                report.detailed_history.append({
+                    "date": date,
+                    "mileage": mileage,
+                    "events": events
+                })
         
         # إذا لم يتم العثور على عدد سجلات الخدمة، نستخدم عدد الأحداث
         if report.service_records_count == 0 and report.detailed_history:
@@ -687,6 +1203,16 @@ class FullReportScraper:
         return report
 
 
+def _write_csv(path: Path, rows: List[Dict[str, str]]) -> None:
+    """كتابة صفوف CSV (المجلد يجب أن يكون موجوداً)"""
+    with path.open('w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+    
+    console.print(f"[green]✓ تم حفظ CSV: {path}[/green]")
+
+
 async def scrape_full_report(vin: str, output_dir: str = "data/output", get_wholesale: bool = True, fast_mode: bool = False) -> FullCarfaxReport:
     """
     دالة مساعدة لسحب التقرير الكامل وتصديره
@@ -704,25 +1230,53 @@ async def scrape_full_report(vin: str, output_dir: str = "data/output", get_whol
     report = await scraper.scrape_report(vin, get_wholesale, fast_mode)
     
     if not report.error:
-        # تصدير JSON
-        json_path = f"{output_dir}/carfax_full_{vin}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        report.to_json(json_path)
-        
-        # تصدير CSV
-        import csv
-        csv_path = f"{output_dir}/carfax_full_{vin}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        Path(csv_path).parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=report.to_csv_row().keys())
-            writer.writeheader()
-            writer.writerow(report.to_csv_row())
+        out = Path(output_dir)
+        out.mkdir(parents=True, exist_ok=True)
+        stem = f"carfax_full_{vin}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
-        console.print(f"[green]✓ تم حفظ CSV: {csv_path}[/green]")
+        # تصدير JSON و CSV (خارج الـ event loop)
+        await asyncio.to_thread(report.to_json, out / f"{stem}.json", False)
+        await asyncio.to_thread(_write_csv, out / f"{stem}.csv", [report.to_csv_row()])
     
     return report
 
 
+async def scrape_full_reports(
+    vins: List[str],
+    output_dir: str = "data/output",
+    get_wholesale: bool = True,
+    fast_mode: bool = False,
+    concurrency: int = 8
+) -> List[FullCarfaxReport]:
+    """
+    دالة مساعدة لسحب دفعة تقارير وتصديرها إلى ملف Parquet واحد
+    
+    إذا لم تكن pyarrow مثبتة يتم التصدير إلى CSV واحد بدلاً منها
+    
+    Args:
+        vins: قائمة أرقام VIN
+        output_dir: مجلد الإخراج
+        get_wholesale: هل نحاول الحصول على سعر الـ Wholesale
+        fast_mode: وضع سريع (بدون حفظ debug files)
+        concurrency: عدد الصفحات المفتوحة في نفس الوقت
+        
+    Returns:
+        التقارير بنفس ترتيب vins
+    """
+    scraper = FullReportScraper()
+    reports = await scraper.scrape_many(vins, get_wholesale, fast_mode, concurrency)
+    
+    out = Path(output_dir)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    parquet_path = await asyncio.to_thread(export_parquet, reports, out / f"carfax_full_{timestamp}.parquet")
+    if parquet_path is None and reports:
+        # export_parquet لم ينشئ المجلد
+        out.mkdir(parents=True, exist_ok=True)
+        await asyncio.to_thread(_write_csv, out / f"carfax_full_{timestamp}.csv", [r.to_csv_row() for r in reports])
+    
+    return reports
+
+
 # للتشغيل المباشر
 if __name__ == "__main__":
     import sys
@@ -732,4 +1286,11 @@ if __name__ == "__main__":
     else:
         vin = "WBAVC93528K043325"
     
-    asyncio.run(scrape_full_report(vin))
+    async def _main() -> None:
+        try:
+            await scrape_full_report(vin)
+        finally:
+            # المتصفح المشترك لا يُغلق تلقائياً مع نهاية الـ event loop
+            await shutdown_browser()
+    
+    asyncio.run(_main())
@@ -5,19 +5,23 @@ Vehicle History Scraper Module
 """
 
 import asyncio
+import gzip
 import random
 import re
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, AsyncGenerator
+from typing import Dict, Optional, AsyncGenerator, AsyncIterator
 
 
+import orjson
 from playwright.async_api import async_playwright, Page, Browser
-from bs4 import BeautifulSoup
-from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
 
+from ..log import console
 from ..auth.cookies import CookieManager
 from ..config import (
     CARFAX_BASE_URL,
@@ -30,19 +34,264 @@ from ..config import (
     USER_AGENT,
     PROXY_ENABLED,
     USE_CHROME_PROFILE,
-    CHROME_USER_DATA_DIR,
-    CHROME_PROFILE,
+    CHROME_PROFILE_DIR,
+    CACHE_DIR,
+    CACHE_TTL,
+    DEBUG_HTML,
+    DATA_DIR,
+    STATE_FILE,
+    STATE_MAX_AGE,
+    HTTP_FAST_LANE,
     validate_credentials,
     get_playwright_proxy,
+    get_httpx_proxy,
 )
 
-console = Console()
 
+# selectolax (Lexbor) لتحليل التقرير - أسرع بكثير من BeautifulSoup
+# BeautifulSoup يبقى كبديل إذا لم تكن selectolax مثبتة
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+    from bs4 import BeautifulSoup
+    
+    # lxml (C) أسرع بكثير من html.parser - نرجع لـ html.parser إذا لم يكن مثبتاً
+    try:
+        import lxml  # noqa: F401
+        _BS_PARSER = "lxml"
+    except ImportError:
+        _BS_PARSER = "html.parser"
+
+# httpx (اختياري) - المسار السريع بدون متصفح (HTTP_FAST_LANE)
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+# ==========================================
+# أنماط الاستخراج (مُجمّعة مرة واحدة عند الاستيراد)
+# ==========================================
+
+# VIN: 17 حرفاً/رقماً بدون I, O, Q
+_VIN_RE = re.compile(r"^[A-HJ-NPR-Z0-9]{17}$")
+_VIN_FORBIDDEN = frozenset("IOQ")
+
+# بيانات إضافية
+# القيمة مع العنوان فقط (وليس أول رقم بعلامة $ في الصفحة)
+_RETAIL_VALUE_RE = re.compile(r'(\$[\d,]+(?:\.\d{2})?)\s+CARFAX\s+Retail\s+Value', re.IGNORECASE)
+_LAST_STATE_RE = re.compile(r'Last owned in\s+([A-Za-z\s]+)')
+_ADDITIONAL_TERMS = tuple(
+    (key, tuple((term.lower(), term) for term in terms))
+    for key, terms in (
+        ('vehicle_type', ('SEDAN', 'SUV', 'COUPE', 'TRUCK', 'VAN', 'WAGON', 'CONVERTIBLE', 'HATCHBACK')),
+        ('fuel_type', ('GASOLINE', 'DIESEL', 'ELECTRIC', 'HYBRID', 'FLEX FUEL')),
+        ('drive_type', ('ALL WHEEL DRIVE', 'FRONT WHEEL DRIVE', 'REAR WHEEL DRIVE', '4WD', 'AWD', 'FWD', 'RWD')),
+    )
+)
+
+# السنة/الشركة/الموديل
+_KNOWN_MAKES = (
+    'Honda', 'Toyota', 'Ford', 'Chevrolet', 'Chevy', 'BMW', 'Mercedes', 
+    'Audi', 'Volkswagen', 'VW', 'Nissan', 'Hyundai', 'Kia', 'Mazda',
+    'Subaru', 'Lexus', 'Acura', 'Infiniti', 'Jeep', 'Dodge', 'Ram',
+    'Chrysler', 'GMC', 'Cadillac', 'Buick', 'Lincoln', 'Volvo', 'Porsche',
+    'Tesla', 'Mitsubishi', 'Suzuki', 'Fiat', 'Alfa', 'Jaguar', 'Land',
+    'Range', 'Mini', 'Smart', 'Scion', 'Saturn', 'Pontiac', 'Oldsmobile',
+    'Mercury', 'Hummer', 'Saab', 'Isuzu', 'Daewoo', 'Genesis', 'Polestar'
+)
+# الاسم كما في القائمة (للإرجاع بنفس الكتابة مهما كانت حالة الأحرف في الصفحة)
+_KNOWN_MAKES_BY_LOWER = {make.lower(): make for make in _KNOWN_MAKES}
+_YMM_RE = re.compile(r'(\d{4})\s+([A-Za-z]+)\s+(.+)')
+# كل الشركات في نمط واحد (مرور واحد بدلاً من نمط لكل شركة)
+_MAKE_ALT_RE = re.compile(
+    r'(\d{4})\s+(' + '|'.join(map(re.escape, _KNOWN_MAKES)) + r')\s+([A-Za-z0-9]+(?:\s+[A-Za-z0-9]+)?)',
+    re.IGNORECASE
+)
+_YEAR_RE = re.compile(r'\b(19[89]\d|20[0-2]\d)\b')
+
+def _patterns(*patterns: str) -> tuple:
+    """تجميع أنماط (كل منها بمجموعة واحدة) - الترتيب = الأولوية"""
+    return tuple(re.compile(p, re.IGNORECASE) for p in patterns)
+
+
+def _first_groups(patterns: tuple, text: str):
+    """قيمة أول تطابق لكل نمط حسب الأولوية (كسول - يتوقف عند أول قيمة يقبلها المستدعي)"""
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match:
+            yield match.group(1)
+
+
+# عدد الملاك
+_OWNERS_RES = _patterns(
+    r'(\d+)\s*Previous\s*owners?',  # "2 Previous owners"
+    r'(\d+)\s*owner',  # "2 owner"
+    r'owner[s]?["\s:>]+(\d+)',
+)
+_OWNER_ELEMENT_RE = re.compile(r'(\d+)\s*(?:Previous\s*)?owner', re.IGNORECASE)
+
+# الحوادث
+_NO_ACCIDENT_RE = re.compile(r'no\s*accident', re.IGNORECASE)
+_ACCIDENT_ELEMENT_RE = re.compile(r'(\d+)\s*accident', re.IGNORECASE)
+_ACCIDENT_RES = _patterns(
+    r'(\d+)\s*accident',
+    r'accident[s]?["\s:>]+(\d+)',
+)
+
+# سجلات الخدمة
+_SERVICE_RES = _patterns(
+    r'(\d+)\s*Service\s*history\s*records?',  # "38 Service history records"
+    r'(\d+)\s*service\s*records?',
+    # نافذة محدودة بعد "service" - ".*?" بدون حد تربيعية على HTML في سطر واحد (minified)
+    r'service.{0,500}?(\d+)\s*records?',
+)
+
+# قراءة العداد
+_MILEAGE_RES = _patterns(
+    r'([\d,]+)\s*Last\s*reported\s*odometer\s*reading',  # "108,487 Last reported odometer reading"
+    r'Last\s*reported\s*odometer\s*reading[:\s]*([\d,]+)',
+    r'odometer[:\s]*([\d,]+)',
+    r'([\d,]+)\s*(?:miles|mi)\b',
+    r'mileage[:\s]*([\d,]+)',
+)
+_NUMBER_RE = re.compile(r'([\d,]+)')
+_DIGIT_RE = re.compile(r'\d')
+
+# حالة العنوان (الترتيب = الأولوية)
+_TITLE_STATUSES = (
+    ("clean title", "Clean"),
+    ("salvage", "Salvage"),
+    ("rebuilt", "Rebuilt"),
+    ("flood", "Flood"),
+    ("lemon", "Lemon"),
+    ("junk", "Junk"),
+)
+
+# عناصر عنوان التقرير (السنة/الشركة/الموديل)
+_TITLE_CLASSES = frozenset({"vehicle-title", "vehicle-header", "vhr-title", "report-title"})
+
+
+def _elem_text(elem, strip: bool = False) -> str:
+    """نص العنصر (Lexbor node أو BeautifulSoup Tag)"""
+    if LexborHTMLParser is not None:
+        return elem.text(strip=strip)
+    return elem.get_text(strip=strip)
+
+
+def _has_digit(elem) -> bool:
+    """هل في نصوص العنصر رقم؟ (يتوقف عند أول نص فيه رقم بدون تجميع النص كاملاً)"""
+    if LexborHTMLParser is not None:
+        return True  # text() في C رخيصة - لا داعي للفحص المسبق
+    return elem.find(string=_DIGIT_RE) is not None
+
+
+def _parse_elements(html: str) -> Dict[str, list]:
+    """
+    تحليل الصفحة ثم مرور واحد على الشجرة بدلاً من select لكل دالة استخراج:
+    تصنيف العناصر حسب الـ class (بنفس ترتيب ظهورها في الصفحة)
+    """
+    if LexborHTMLParser is not None:
+        tree = LexborHTMLParser(html)
+        # get_text في BeautifulSoup لا يشمل نص scripts/styles - نفس النتيجة هنا
+        tree.strip_tags(["script", "style", "noscript", "template"])
+        nodes = ((node, node.attributes.get("class") or "") for node in tree.css("[class]"))
+    else:
+        soup = BeautifulSoup(html, _BS_PARSER)
+        nodes = ((elem, elem.get("class")) for elem in soup.find_all(class_=True))
+    
+    elements: Dict[str, list] = {"title": [], "year": [], "owner": [], "accident": [], "mileage": []}
+    for elem, classes in nodes:
+        if isinstance(classes, str):
+            classes = classes.split()
+        cls = " ".join(classes)
+        
+        if "year-make-model" in cls or not _TITLE_CLASSES.isdisjoint(classes):
+            elements["title"].append(elem)
+        if "year" in cls or "vehicle" in cls:
+            elements["year"].append(elem)
+        if "owner" in cls:  # يشمل ownership-history
+            elements["owner"].append(elem)
+        if "accident" in cls:
+            elements["accident"].append(elem)
+        if "mileage" in cls or "odometer" in cls:
+            elements["mileage"].append(elem)
+    return elements
+
+
+# حقول نموذج تسجيل الدخول (محددات مدمجة بفاصلة كما في auth/login.py)
+_LOGIN_SELECTORS = {
+    "email_input": 'input[name="username"], input[type="email"], #username',
+    "password_input": 'input[name="password"], input[type="password"], #password',
+    "submit_button": 'button[type="submit"], button[name="action"]',
+}
+
+# حالة الدخول تُحدد من أول جزء من الصفحة فقط
+_LOGIN_PROBE_CHARS = 16384
+_LOGIN_PAGE_INDICATORS = ("dealer account sign in", "landingpage", "get the most info now")
+_PAGE_HEAD_JS = "(n) => document.documentElement.outerHTML.slice(0, n)"
 
-@dataclass
+# فحوصات تُنفَّذ داخل الصفحة وتُرجع bool فقط (بدلاً من نقل HTML/النص كاملاً عبر Playwright)
+_REPORT_PAGE_JS = """(vin) => {
+    const text = document.body ? document.body.innerText : "";
+    return text.includes(vin) || text.includes("Previous owner") || text.toLowerCase().includes("accident");
+}"""
+_LOGGED_IN_JS = """() => {
+    const html = document.documentElement.outerHTML.toLowerCase();
+    return html.includes("logout") || html.includes("sign out");
+}"""
+
+
+def _new_progress() -> Progress:
+    """شريط تقدم السحب (نفس الأعمدة لكل الدفعات)"""
+    return Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+        console=console
+    )
+
+
+# الموارد التي لا يحتاجها استخراج البيانات (كل VIN يحمّل صفحة كاملة)
+# لا نحجب CSS/JS لأنها قد تكون مطلوبة لعرض البيانات والنماذج
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+_BLOCKED_DOMAINS = (
+    "google-analytics", "googletagmanager", "doubleclick",
+    "hotjar", "facebook.net", "optimizely",
+)
+
+
+def _write_gz(path: Path, text: str) -> None:
+    """كتابة نص مضغوط بـ gzip (compresslevel=1 - الأسرع)"""
+    with gzip.open(path, "wt", encoding="utf-8", compresslevel=1) as f:
+        f.write(text)
+
+
+async def _route_filter(route) -> None:
+    """حجب الصور/الخطوط/الفيديو وسكربتات التتبع"""
+    request = route.request
+    if request.resource_type in _BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+        return
+    url = request.url
+    if any(domain in url for domain in _BLOCKED_DOMAINS):
+        await route.abort()
+        return
+    await route.continue_()
+
+
+@dataclass(slots=True)
 class VehicleReport:
     """نموذج بيانات تقرير المركبة"""
     
+    # ترتيب أعمدة التصدير (مطابق لـ CSVExporter.DEFAULT_COLUMNS)
+    EXPORT_FIELDS = (
+        "vin", "year", "make", "model", "trim", "owners", "accidents",
+        "service_records", "mileage", "title_status", "report_date", "error"
+    )
+    
     vin: str
     year: Optional[str] = None
     make: Optional[str] = None
@@ -54,7 +303,7 @@ class VehicleReport:
     mileage: Optional[str] = None
     title_status: Optional[str] = None
     report_date: str = field(default_factory=lambda: datetime.now().strftime("%Y-%m-%d"))
-    raw_data: dict = field(default_factory=dict)
+    raw_data: dict = field(default_factory=dict, repr=False)
     error: Optional[str] = None
     
     def to_dict(self) -> dict:
@@ -73,6 +322,10 @@ class VehicleReport:
             "report_date": self.report_date,
             "error": self.error
         }
+    
+    def to_row(self) -> tuple:
+        """تحويل إلى صف CSV بترتيب EXPORT_FIELDS (بدون قاموس وسيط)"""
+        return tuple(getattr(self, f) for f in self.EXPORT_FIELDS)
 
 
 class VehicleHistoryScraper:
@@ -95,43 +348,152 @@ class VehicleHistoryScraper:
             cookie_manager: مدير الـ cookies
         """
         self.cookie_manager = cookie_manager
+        self._playwright = None
         self._browser = None
         self._context = None
+        # حالة الجلسة (cookies + localStorage) لكل context جديد - تُحدّث بعد تسجيل الدخول
+        self._storage_state = None
+        # تسجيل دخول واحد في نفس الوقت عند السحب المتوازي
+        self._login_lock = asyncio.Lock()
+        # مجلد الكاش يُنشأ مرة واحدة عند أول كتابة
+        self._cache_dir_ready = False
+        # طلب واحد جارٍ لكل VIN - الطلبات المكررة تنتظر نفس النتيجة
+        self._inflight: dict[str, asyncio.Future] = {}
+        # عدد مستخدمي المتصفح الحاليين - يُغلق عند خروج آخرهم فقط
+        self._users = 0
+        # الإطلاق/الإغلاق لا يتداخلان بين الاستدعاءات المتزامنة
+        self._browser_lock = asyncio.Lock()
+        # HTTP client للمسار السريع (يعيش مع المتصفح)
+        self._http = None
+        # يزيد مع كل تسجيل دخول - الـ VINs المنتظرة تعرف أن الجلسة تجددت
+        self._session_generation = 0
+    
+    async def __aenter__(self) -> "VehicleHistoryScraper":
+        await self._acquire(launch=True)
+        return self
+    
+    async def _acquire(self, launch: bool) -> None:
+        """
+        حجز المتصفح المشترك (يُغلق عند __aexit__ آخر مستخدم)
+        
+        Args:
+            launch: إطلاق المتصفح الآن، أو حجز فقط (الإطلاق عند أول VIN يحتاجه)
+        """
+        async with self._browser_lock:
+            self._users += 1
+            try:
+                if self._http is None and HTTP_FAST_LANE and httpx is not None:
+                    self._http = self._new_http_client()
+                if launch:
+                    await self._init_browser()
+            except BaseException:
+                self._users -= 1
+                # إطلاق فاشل: إغلاق ما بدأ (Playwright/المتصفح) حتى تعيد المحاولة التالية الإطلاق
+                if launch:
+                    await self._close_browser()
+                if self._users == 0:
+                    await self._release()
+                raise
+    
+    async def __aexit__(self, *exc) -> None:
+        async with self._browser_lock:
+            self._users -= 1
+            if self._users == 0:
+                await self._release()
+    
+    async def _release(self) -> None:
+        """إغلاق الـ HTTP client والمتصفح"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        await self._close_browser()
     
     async def _init_browser(self):
-        """تهيئة المتصفح مع دعم البروكسي"""
-        if self._browser is None:
-            p = await async_playwright().start()
-            self._browser = await p.chromium.launch(
-                headless=HEADLESS,
-                proxy=get_playwright_proxy()
-            )
-            self._context = await self._browser.new_context(
-                user_agent=USER_AGENT,
-                viewport={"width": 1920, "height": 1080}
+        """تهيئة المتصفح مرة واحدة لكل VINs (مع دعم البروكسي و Chrome Profile)"""
+        if self._playwright is not None:
+            return
+        
+        self._playwright = await async_playwright().start()
+        p = self._playwright
+        
+        # عرض حالة المتصفح
+        if USE_CHROME_PROFILE:
+            console.print("[cyan]  🌐 استخدام Chrome Profile الحالي[/cyan]")
+            # استخدام Chrome المثبت مع الـ profile الحالي (context واحد مشترك)
+            self._context = await p.chromium.launch_persistent_context(
+                user_data_dir=CHROME_PROFILE_DIR,
+                channel="chrome",  # استخدام Chrome المثبت
+                headless=False,  # Chrome profile لا يعمل في headless
+                viewport={"width": 1920, "height": 1080},
+                args=[
+                    "--disable-blink-features=AutomationControlled",
+                    "--disable-dev-shm-usage",
+                    "--no-sandbox"
+                ]
             )
-            
-            # تحميل الـ cookies
-            cookies = self.cookie_manager.get_cookies_for_playwright()
-            if cookies:
-                await self._context.add_cookies(cookies)
-            
-            if PROXY_ENABLED:
-                console.print("[cyan]  🌐 المتصفح: البروكسي مفعل[/cyan]")
+            await self._context.route("**/*", _route_filter)
+            return
+        
+        if PROXY_ENABLED:
+            console.print("[cyan]  🌐 البروكسي مفعل (Bright Data)[/cyan]")
+        
+        # الوضع العادي
+        self._browser = await p.chromium.launch(
+            headless=HEADLESS,
+            proxy=get_playwright_proxy()
+        )
+        
+        # حالة الجلسة المحفوظة من تشغيل سابق (cookies + localStorage) إن كانت حديثة
+        if self._state_file_fresh():
+            console.print("[dim]  ♻ استخدام جلسة المتصفح المحفوظة[/dim]")
+            self._storage_state = str(STATE_FILE)
+            return
+        
+        # تحميل الـ cookies
+        cookies = self.cookie_manager.get_cookies_for_playwright()
+        self._storage_state = {"cookies": cookies, "origins": []} if cookies else None
+    
+    def _state_file_fresh(self) -> bool:
+        """
+        هل ملف storage_state موجود وأحدث من STATE_MAX_AGE ومن ملف الـ cookies
+        
+        cookies أحدث (أمر login أو ensure_authenticated) تتقدم على جلسة متصفح قديمة
+        """
+        try:
+            state_mtime = STATE_FILE.stat().st_mtime
+        except OSError:
+            return False
+        if time.time() - state_mtime >= STATE_MAX_AGE:
+            return False
+        try:
+            return state_mtime >= self.cookie_manager.cookies_file.stat().st_mtime
+        except OSError:
+            # لا ملف cookies - الجلسة المحفوظة هي المصدر الوحيد
+            return True
     
     async def _close_browser(self):
-        """إغلاق المتصفح"""
-        if self._browser:
-            await self._browser.close()
-            self._browser = None
-            self._context = None
+        """إغلاق المتصفح (يتحمّل حالة إطلاق ناقصة)"""
+        context, browser, playwright = self._context, self._browser, self._playwright
+        self._context = self._browser = self._playwright = None
+        for closer in (
+            context.close if context is not None else None,
+            browser.close if browser is not None else None,
+            playwright.stop if playwright is not None else None,
+        ):
+            if closer is None:
+                continue
+            try:
+                await closer()
+            except:
+                pass
     
-    async def get_report(self, vin: str) -> VehicleReport:
+    async def get_report(self, vin: str, force_refresh: bool = False) -> VehicleReport:
         """
         سحب تقرير مركبة واحدة
         
         Args:
             vin: رقم تعريف المركبة (VIN)
+            force_refresh: تجاهل الكاش والسحب من الموقع
             
         Returns:
             تقرير المركبة
@@ -140,236 +502,422 @@ class VehicleHistoryScraper:
         if not self._validate_vin(vin):
             return VehicleReport(vin=vin, error="VIN غير صالح")
         
-        console.print(f"[blue]🔍 جاري البحث عن: {vin}[/blue]")
+        # VIN قيد السحب بالفعل (مكرر في القائمة أو استدعاء متزامن)
+        inflight = self._inflight.get(vin)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
         
-        # عرض حالة المتصفح
-        if USE_CHROME_PROFILE:
-            console.print("[cyan]  🌐 استخدام Chrome Profile الحالي[/cyan]")
-        elif PROXY_ENABLED:
-            console.print("[cyan]  🌐 البروكسي مفعل (Bright Data)[/cyan]")
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[vin] = future
+        try:
+            report = await self._get_report(vin, force_refresh)
+            future.set_result(report)
+            return report
+        except asyncio.CancelledError:
+            # إلغاء السحب الأصلي فقط يُلغي المنتظرين
+            future.cancel()
+            raise
+        except BaseException as e:
+            # فشل: المنتظرون يرون نفس الاستثناء بدلاً من CancelledError
+            future.set_exception(e)
+            future.exception()  # تعليمه كمقروء حتى لا يُسجَّل "never retrieved" بلا منتظرين
+            raise
+        finally:
+            self._inflight.pop(vin, None)
+    
+    async def _get_report(self, vin: str, force_refresh: bool) -> VehicleReport:
+        """سحب تقرير (الكاش أولاً ثم المتصفح)"""
+        # الكاش أولاً (قراءة ملف بدلاً من متصفح + شبكة)
+        if not force_refresh:
+            report = await asyncio.to_thread(self._read_cache, vin)
+            if report is not None:
+                console.print(f"[dim]  ♻ من الكاش: {vin}[/dim]")
+                return report
         
+        # المسار السريع: صفحة التقرير عبر HTTP مباشرة (بدون متصفح)
+        if HTTP_FAST_LANE and httpx is not None:
+            report = await self._fetch_via_http(vin)
+            if report is not None:
+                return report
+        
+        # يعيد استخدام المتصفح المفتوح (get_reports أو async with خارجي)،
+        # وإلا يُطلق ويُغلق لهذا الـ VIN فقط
+        error = await self._open()
+        if error is not None:
+            return VehicleReport(vin=vin, error=error)
         try:
-            async with async_playwright() as p:
-                # استخدام Chrome Profile إذا كان مفعل
-                if USE_CHROME_PROFILE:
-                    import os
-                    # استخدام Chrome المثبت مع الـ profile الحالي
-                    context = await p.chromium.launch_persistent_context(
-                        user_data_dir=os.path.join(CHROME_USER_DATA_DIR, CHROME_PROFILE),
-                        channel="chrome",  # استخدام Chrome المثبت
-                        headless=False,  # Chrome profile لا يعمل في headless
-                        viewport={"width": 1920, "height": 1080},
-                        args=[
-                            "--disable-blink-features=AutomationControlled",
-                            "--disable-dev-shm-usage",
-                            "--no-sandbox"
-                        ]
-                    )
-                    browser = None  # لا يوجد browser منفصل
-                    page = context.pages[0] if context.pages else await context.new_page()
-                else:
-                    # الوضع العادي
-                    browser = await p.chromium.launch(
-                        headless=HEADLESS,
-                        proxy=get_playwright_proxy()
-                    )
-                    context = await browser.new_context(
-                        user_agent=USER_AGENT,
-                        viewport={"width": 1920, "height": 1080},
-                        ignore_https_errors=PROXY_ENABLED
-                    )
-                    
-                    # تحميل الـ cookies
-                    cookies = self.cookie_manager.get_cookies_for_playwright()
-                    if cookies:
-                        await context.add_cookies(cookies)
-                    
-                    page = await context.new_page()
-                
-                # الذهاب للصفحة الرئيسية أولاً
-                await page.goto(CARFAX_BASE_URL, wait_until="networkidle")
-                await asyncio.sleep(2)
-                
-                # التحقق من حالة الجلسة وتسجيل الدخول إذا لزم
-                html = await page.content()
-                if self._is_login_required(html):
-                    console.print("[yellow]  → جاري تسجيل الدخول...[/yellow]")
-                    success = await self._login_in_browser(page)
-                    if not success:
-                        await browser.close()
-                        return VehicleReport(vin=vin, error="فشل تسجيل الدخول")
-                    await asyncio.sleep(2)
-                
-                # البحث عن حقل VIN وإدخاله
-                vin_found = False
+            return await self._scrape_with_context(vin)
+        finally:
+            await self.__aexit__(None, None, None)
+    
+    async def _open(self) -> Optional[str]:
+        """
+        فتح المتصفح (مثل async with self) مع تحويل فشل الإطلاق لرسالة خطأ
+        
+        Returns:
+            None عند النجاح، أو نص الخطأ (ولا حاجة لـ __aexit__ حينها)
+        """
+        try:
+            await self.__aenter__()
+        except Exception as e:
+            console.print(f"[red]✗ فشل تشغيل المتصفح: {e}[/red]")
+            return str(e)
+        return None
+    
+    def _new_http_client(self) -> "httpx.AsyncClient":
+        """HTTP client بنفس cookies الجلسة و User-Agent المتصفح"""
+        cookies = httpx.Cookies()
+        for c in self.cookie_manager.get_cookies_for_playwright():
+            cookies.set(c["name"], c["value"], domain=c["domain"], path=c["path"])
+        
+        # تعطيل التحقق من SSL عند استخدام البروكسي (كما في api_scraper)
+        return httpx.AsyncClient(
+            http2=True,
+            timeout=15.0,
+            proxy=get_httpx_proxy(),
+            verify=not PROXY_ENABLED,
+            follow_redirects=True,
+            cookies=cookies,
+            headers={"User-Agent": USER_AGENT},
+        )
+    
+    async def _refresh_http_cookies(self, page: Page) -> None:
+        """نسخ cookies الجلسة الجديدة للـ HTTP client بعد تسجيل الدخول (مرة واحدة لكل تسجيل)"""
+        if self._http is None:
+            return
+        for c in await page.context.cookies():
+            self._http.cookies.set(c["name"], c["value"], domain=c["domain"], path=c["path"])
+    
+    async def _fetch_via_http(self, vin: str) -> Optional[VehicleReport]:
+        """
+        جلب صفحة التقرير عبر httpx
+        
+        Returns:
+            التقرير، أو None إذا احتاجت الصفحة تسجيل دخول/JavaScript (الرجوع للمتصفح)
+        """
+        url = f"{CARFAX_BASE_URL}/vhr/{vin}"
+        try:
+            if self._http is not None:
+                response = await self._http.get(url)
+            else:
+                # استدعاء منفرد: client مؤقت لهذا الطلب فقط
+                async with self._new_http_client() as client:
+                    response = await client.get(url)
+        except httpx.HTTPError as e:
+            console.print(f"[dim]  HTTP: {e} - الرجوع للمتصفح[/dim]")
+            return None
+        
+        html = response.text
+        # الصفحة لا تحتوي التقرير (تسجيل دخول / محتوى يُبنى بـ JavaScript)
+        if response.status_code != 200 or vin not in html or self._is_login_required(html):
+            return None
+        
+        report = await asyncio.to_thread(self._extract_report_data, vin, html)
+        if report.error or not (report.year or report.make or report.model):
+            return None
+        
+        console.print(f"[dim]  ⚡ HTTP: {vin}[/dim]")
+        await asyncio.to_thread(self._write_cache, vin, html, report)
+        
+        # نفس التأخير العشوائي لمسار المتصفح (الطلبات تصل لنفس الخادم)
+        await asyncio.sleep(random.uniform(MIN_DELAY, MAX_DELAY))
+        return report
+    
+    async def _scrape_with_context(self, vin: str) -> VehicleReport:
+        """
+        سحب تقرير واحد بالمتصفح المشترك
+        
+        كل VIN يحصل على context جديد (أو صفحة جديدة في Chrome Profile)
+        يُغلق بعد الانتهاء
+        """
+        console.print(f"[blue]🔍 جاري البحث عن: {vin}[/blue]")
+        
+        context = None
+        page = None
+        # الجلسة التي يبدأ بها هذا الـ context - تسجيل دخول حدث بعدها يعني أن جلستنا قديمة
+        generation = self._session_generation
+        storage_state = self._storage_state
+        try:
+            if self._context is not None:
+                # Chrome Profile: الجلسة موجودة في الـ profile نفسه
+                page = await self._context.new_page()
+            else:
+                context = await self._browser.new_context(
+                    user_agent=USER_AGENT,
+                    viewport={"width": 1920, "height": 1080},
+                    ignore_https_errors=PROXY_ENABLED,
+                    storage_state=storage_state
+                )
+                await context.route("**/*", _route_filter)
+                page = await context.new_page()
+            
+            # الذهاب للصفحة الرئيسية أولاً
+            # networkidle يعني أن الصفحة استقرت - لا حاجة لانتظار ثابت بعده
+            await page.goto(CARFAX_BASE_URL, wait_until="networkidle")
+            
+            # التحقق من حالة الجلسة وتسجيل الدخول إذا لزم
+            html_head = await page.evaluate(_PAGE_HEAD_JS, _LOGIN_PROBE_CHARS)
+            if self._is_login_required(html_head):
+                async with self._login_lock:
+                    if self._session_generation != generation:
+                        # VIN آخر سجل الدخول أثناء الانتظار - نسخ الجلسة الجديدة بدلاً من تسجيل دخول ثانٍ
+                        if context is not None and isinstance(self._storage_state, dict):
+                            await context.add_cookies(self._storage_state["cookies"])
+                        await page.goto(CARFAX_BASE_URL, wait_until="networkidle")
+                    else:
+                        console.print("[yellow]  → جاري تسجيل الدخول...[/yellow]")
+                        success = await self._login_in_browser(page)
+                        if not success:
+                            return VehicleReport(vin=vin, error="فشل تسجيل الدخول")
+                        await page.wait_for_load_state("domcontentloaded")
+                        self._session_generation += 1
+                        
+                        # الـ contexts التالية (والتشغيلات القادمة) ترث الجلسة بدلاً من تسجيل الدخول مجدداً
+                        if context is not None:
+                            self._storage_state = await context.storage_state(path=STATE_FILE)
+                        await self._refresh_http_cookies(page)
+            
+            # البحث عن حقل VIN وإدخاله
+            vin_found = False
+            try:
+                # انتظار ظهور حقل VIN (بدلاً من انتظار ثابت لتحميل الصفحة)
                 try:
-                    # انتظار تحميل الصفحة بالكامل
-                    await asyncio.sleep(3)
-                    
-                    # انتظار ظهور حقل VIN
+                    await page.wait_for_selector('#vin', state='visible', timeout=10000)
+                except:
+                    console.print("[yellow]  ⚠ انتظار ظهور حقل VIN...[/yellow]")
+            
+                # Locator.fill ينتظر جاهزية الحقل ويمسحه ويُدخل القيمة في خطوة واحدة
+                vin_input = page.locator('#vin')
+                await vin_input.fill(vin)
+            
+                # التحقق من إدخال VIN
+                entered_value = await vin_input.input_value()
+                console.print(f"[dim]  القيمة المدخلة: {entered_value}[/dim]")
+            
+                if entered_value == vin:
+                    console.print(f"[green]  ✓ تم إدخال VIN بنجاح[/green]")
+                    vin_found = True
+                else:
+                    # محاولة ثانية باستخدام type
+                    console.print("[yellow]  ⚠ محاولة إدخال VIN بطريقة أخرى...[/yellow]")
+                    await vin_input.click(click_count=3)  # تحديد الكل
+                    await page.keyboard.type(vin, delay=100)
+                    entered_value = await vin_input.input_value()
+                    console.print(f"[dim]  القيمة بعد المحاولة الثانية: {entered_value}[/dim]")
+                    vin_found = len(entered_value) > 0
+            
+                # التحقق من زر البحث
+                search_button = page.locator('#run_vhr_button')
+            
+                if await search_button.count():
+                    # النقر على الزر
+                    console.print("[dim]  النقر على زر البحث...[/dim]")
+                    url_before = page.url
+            
+                    # click ينتظر تفعيل الزر تلقائياً (بدلاً من فحص disabled يدوياً)
                     try:
-                        await page.wait_for_selector('#vin', timeout=10000)
+                        await search_button.click(timeout=5000)
                     except:
-                        console.print("[yellow]  ⚠ انتظار ظهور حقل VIN...[/yellow]")
-                    
-                    # استخدام Playwright's fill مع force
-                    await page.click('#vin')
-                    await asyncio.sleep(0.5)
-                    
-                    # مسح أي محتوى موجود
-                    await page.fill('#vin', '')
-                    await asyncio.sleep(0.3)
-                    
-                    # إدخال VIN
-                    await page.fill('#vin', vin)
-                    await asyncio.sleep(1)
-                    
-                    # التحقق من إدخال VIN
-                    entered_value = await page.input_value('#vin')
-                    console.print(f"[dim]  القيمة المدخلة: {entered_value}[/dim]")
-                    
-                    if entered_value == vin:
-                        console.print(f"[green]  ✓ تم إدخال VIN بنجاح[/green]")
-                        vin_found = True
-                    else:
-                        # محاولة ثانية باستخدام type
-                        console.print("[yellow]  ⚠ محاولة إدخال VIN بطريقة أخرى...[/yellow]")
-                        await page.click('#vin', click_count=3)  # تحديد الكل
-                        await page.keyboard.type(vin, delay=100)
-                        await asyncio.sleep(1)
-                        entered_value = await page.input_value('#vin')
-                        console.print(f"[dim]  القيمة بعد المحاولة الثانية: {entered_value}[/dim]")
-                        vin_found = len(entered_value) > 0
-                    
-                    # انتظار تفعيل زر البحث
-                    await asyncio.sleep(2)
-                    
-                    # التحقق من زر البحث
-                    search_button = await page.query_selector('#run_vhr_button')
-                    
-                    if search_button:
-                        is_disabled = await search_button.get_attribute('disabled')
-                        console.print(f"[dim]  حالة الزر: {'معطل' if is_disabled else 'مفعل'}[/dim]")
-                        
-                        if is_disabled:
-                            console.print("[yellow]  ⚠ الزر معطل - محاولة تفعيل...[/yellow]")
-                            await asyncio.sleep(2)
-                        
-                        # النقر على الزر
-                        console.print("[dim]  النقر على زر البحث...[/dim]")
-                        url_before = page.url
-                        
-                        # النقر على الزر
-                        await search_button.click()
-                        console.print("[dim]  تم النقر - انتظار تحميل المحتوى...[/dim]")
-                        
-                        # انتظار تحميل المحتوى الجديد
-                        await asyncio.sleep(3)
-                        
-                        url_after = page.url
-                        
-                        # إذا لم يتغير الـ URL، حاول الذهاب مباشرة لصفحة التقرير
-                        if url_after == url_before:
-                            console.print("[yellow]  ⚠ الـ URL لم يتغير - محاولة الانتقال مباشرة للتقرير...[/yellow]")
-                            # جرب URLs مختلفة للتقرير
-                            report_urls = [
-                                f"{CARFAX_BASE_URL}/vhr/{vin}",
-                                f"{CARFAX_BASE_URL}/cfm/vehicle-history-report.cfm?vin={vin}",
-                                f"https://www.carfaxonline.com/vhr?vin={vin}",
-                            ]
-                            
-                            for report_url in report_urls:
-                                try:
-                                    console.print(f"[dim]  محاولة: {report_url}[/dim]")
-                                    await page.goto(report_url, wait_until="networkidle", timeout=15000)
-                                    await asyncio.sleep(3)
-                                    
-                                    # تحقق إذا وصلنا لصفحة التقرير
-                                    page_text = await page.inner_text('body')
-                                    if vin in page_text or "Previous owner" in page_text or "accident" in page_text.lower():
-                                        console.print("[green]  ✓ تم العثور على صفحة التقرير![/green]")
-                                        break
-                                except Exception as nav_err:
-                                    console.print(f"[dim]  فشل: {nav_err}[/dim]")
-                                    continue
-                        
-                        # البحث عن عناصر التقرير أو رسائل الخطأ
-                        page_text = await page.inner_text('body')
-                        has_report = vin in page_text or "Previous owner" in page_text or "accident" in page_text.lower()
-                    
-                    # انتظار تحميل النتائج
-                    console.print("[dim]  انتظار تحميل التقرير...[/dim]")
-                    await asyncio.sleep(3)
-                    
-                    current_url = page.url
-                    console.print(f"[dim]  URL الحالي: {current_url}[/dim]")
-                    
-                except Exception as e:
-                    console.print(f"[yellow]  ⚠ خطأ في إدخال VIN: {e}[/yellow]")
-                
-                # الحصول على HTML
-                html = await page.content()
-                
-                # استخراج البيانات
-                report = self._extract_report_data(vin, html)
-                
-                # حفظ HTML للتصحيح
-                debug_file = Path(f"data/debug_{vin}.html")
-                debug_file.parent.mkdir(exist_ok=True)
-                with open(debug_file, "w", encoding="utf-8") as f:
-                    f.write(html)
+                        console.print("[yellow]  ⚠ الزر معطل - محاولة النقر على أي حال...[/yellow]")
+                        await search_button.click(force=True)
+                    console.print("[dim]  تم النقر - انتظار تحميل المحتوى...[/dim]")
+            
+                    # انتظار تغيّر الـ URL (الانتقال لصفحة التقرير)
+                    try:
+                        await page.wait_for_url(lambda url: url != url_before, timeout=15000)
+                    except:
+                        pass
+            
+                    url_after = page.url
+            
+                    # إذا لم يتغير الـ URL، حاول الذهاب مباشرة لصفحة التقرير
+                    if url_after == url_before:
+                        console.print("[yellow]  ⚠ الـ URL لم يتغير - محاولة الانتقال مباشرة للتقرير...[/yellow]")
+                        # جرب URLs مختلفة للتقرير
+                        report_urls = [
+                            f"{CARFAX_BASE_URL}/vhr/{vin}",
+                            f"{CARFAX_BASE_URL}/cfm/vehicle-history-report.cfm?vin={vin}",
+                            f"https://www.carfaxonline.com/vhr?vin={vin}",
+                        ]
+            
+                        for report_url in report_urls:
+                            try:
+                                console.print(f"[dim]  محاولة: {report_url}[/dim]")
+                                await page.goto(report_url, wait_until="networkidle", timeout=15000)
+            
+                                # تحقق إذا وصلنا لصفحة التقرير (الفحص داخل الصفحة - يعود bool فقط)
+                                if await page.evaluate(_REPORT_PAGE_JS, vin):
+                                    console.print("[green]  ✓ تم العثور على صفحة التقرير![/green]")
+                                    break
+                            except Exception as nav_err:
+                                console.print(f"[dim]  فشل: {nav_err}[/dim]")
+                                continue
+            
+                # انتظار تحميل النتائج (حتى تهدأ الشبكة)
+                console.print("[dim]  انتظار تحميل التقرير...[/dim]")
+                try:
+                    await page.wait_for_load_state("networkidle", timeout=10000)
+                except:
+                    pass
+            
+                current_url = page.url
+                console.print(f"[dim]  URL الحالي: {current_url}[/dim]")
+            
+            except Exception as e:
+                console.print(f"[yellow]  ⚠ خطأ في إدخال VIN: {e}[/yellow]")
+            
+            # الحصول على HTML
+            html = await page.content()
+            
+            # استخراج البيانات في thread (التحليل لا يوقف الـ VINs الأخرى على الـ event loop)
+            report = await asyncio.to_thread(self._extract_report_data, vin, html)
+            
+            # حفظ في الكاش فقط إذا كان التقرير صالحاً
+            if not report.error and (report.year or report.make or report.model):
+                await asyncio.to_thread(self._write_cache, vin, html, report)
+            
+            # حفظ HTML للتصحيح (مضغوط، في thread حتى لا تتوقف الـ VINs الأخرى)
+            if DEBUG_HTML:
+                debug_file = DATA_DIR / f"debug_{vin}.html.gz"
+                await asyncio.to_thread(_write_gz, debug_file, html)
                 console.print(f"[dim]  تم حفظ HTML في: {debug_file}[/dim]")
-                
-                # إغلاق المتصفح
-                if USE_CHROME_PROFILE:
-                    await context.close()
-                else:
-                    await browser.close()
-                
-                # تأخير عشوائي
-                await asyncio.sleep(random.uniform(MIN_DELAY, MAX_DELAY))
-                
-                return report
-                
+            
         except Exception as e:
             console.print(f"[red]✗ خطأ: {e}[/red]")
             return VehicleReport(vin=vin, error=str(e))
+        finally:
+            # إغلاق الصفحة/الـ context فقط - المتصفح يبقى للـ VIN التالي
+            # (فشل الإغلاق - target منهار - لا يُسقط تقارير الدفعة الأخرى)
+            try:
+                if context is not None:
+                    await context.close()
+                elif page is not None:
+                    await page.close()
+            except:
+                pass
+        
+        # تأخير عشوائي
+        await asyncio.sleep(random.uniform(MIN_DELAY, MAX_DELAY))
+        
+        return report
     
     async def get_reports(
         self, 
         vins: list[str],
-        progress_callback: Optional[callable] = None
+        progress_callback: Optional[callable] = None,
+        concurrency: int = 8
     ) -> AsyncGenerator[VehicleReport, None]:
         """
-        سحب تقارير متعددة
+        سحب تقارير متعددة بالتوازي (حتى concurrency context في نفس الوقت)
+        
+        التقارير تُعاد بترتيب اكتمالها وليس بترتيب القائمة.
+        أرقام VIN غير الصالحة تُعاد أولاً دون سحب، والمكررة تُسحب مرة واحدة
         
         Args:
             vins: قائمة أرقام VIN
             progress_callback: دالة لتتبع التقدم
+            concurrency: عدد الـ VINs التي تُسحب في نفس الوقت
             
         Yields:
             تقارير المركبات
         """
-        total = len(vins)
-        
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            BarColumn(),
-            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-            console=console
-        ) as progress:
+        valid, invalid = self._partition_vins(vins)
+        for report in invalid:
+            yield report
+        
+        if not valid:
+            return
+        
+        total = len(valid)
+        sem = asyncio.Semaphore(max(1, concurrency))
+        
+        with _new_progress() as progress:
             task = progress.add_task(f"[cyan]سحب {total} تقرير...", total=total)
             
-            for i, vin in enumerate(vins):
-                report = await self.get_report(vin)
-                
+            # متصفح واحد لكل الدفعة (context جديد لكل VIN) - يُطلق عند أول VIN
+            # لا يجده الكاش ولا المسار السريع، فالدفعة المخزنة بالكامل لا تشغّل Chromium
+            await self._acquire(launch=False)
+            tasks = [asyncio.create_task(self._bounded_get(vin, sem)) for vin in valid]
+            
+            try:
+                for i, coro in enumerate(asyncio.as_completed(tasks)):
+                    report = await coro
+                    
+                    progress.update(task, advance=1)
+                    
+                    if progress_callback:
+                        progress_callback(i + 1, total, report)
+                    
+                    yield report
+            finally:
+                # إلغاء المهام المتبقية إذا توقف المستهلك مبكراً (قبل إغلاق المتصفح)
+                for t in tasks:
+                    t.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                await self.__aexit__(None, None, None)
+    
+    async def get_reports_batch(self, vins: list[str], concurrency: int = 8) -> list[VehicleReport]:
+        """
+        سحب تقارير متعددة بالتوازي وإرجاعها دفعة واحدة (بدون yield لكل تقرير)
+        
+        Args:
+            vins: قائمة أرقام VIN
+            concurrency: عدد الـ VINs التي تُسحب في نفس الوقت
+            
+        Returns:
+            التقارير غير الصالحة أولاً ثم باقي التقارير بترتيب القائمة
+        """
+        valid, reports = self._partition_vins(vins)
+        if not valid:
+            return reports
+        
+        sem = asyncio.Semaphore(max(1, concurrency))
+        
+        with _new_progress() as progress:
+            task = progress.add_task(f"[cyan]سحب {len(valid)} تقرير...", total=len(valid))
+            
+            def advance(_: asyncio.Task) -> None:
                 progress.update(task, advance=1)
-                
-                if progress_callback:
-                    progress_callback(i + 1, total, report)
-                
-                yield report
+            
+            # المتصفح يُطلق عند أول حاجة إليه فقط (انظر get_reports)
+            await self._acquire(launch=False)
+            tasks = [asyncio.create_task(self._bounded_get(vin, sem)) for vin in valid]
+            for t in tasks:
+                t.add_done_callback(advance)
+            try:
+                reports.extend(await asyncio.gather(*tasks))
+            finally:
+                # عند الخطأ/الإلغاء: إيقاف المهام المتبقية قبل إغلاق المتصفح
+                for t in tasks:
+                    t.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                await self.__aexit__(None, None, None)
+        
+        return reports
+    
+    def _partition_vins(self, vins: list[str]) -> tuple[list[str], list[VehicleReport]]:
+        """
+        تنقية القائمة قبل السحب: حذف المكرر (مع حفظ الترتيب) ورفض غير الصالح فوراً
+        
+        Returns:
+            (أرقام VIN الصالحة، تقارير خطأ لغير الصالحة)
+        """
+        valid: list[str] = []
+        invalid: list[VehicleReport] = []
+        seen: set[str] = set()
+        for vin in vins:
+            normalized = vin.strip().upper() if vin else ""
+            if not self._validate_vin(normalized):
+                invalid.append(VehicleReport(vin=vin, error="VIN غير صالح"))
+            elif normalized not in seen:
+                seen.add(normalized)
+                valid.append(normalized)
+        return valid, invalid
+    
+    async def _bounded_get(self, vin: str, sem: asyncio.Semaphore) -> VehicleReport:
+        """سحب تقرير مع احترام حد التزامن"""
+        async with sem:
+            return await self.get_report(vin)
     
     async def _login_in_browser(self, page: Page) -> bool:
         """تسجيل الدخول داخل المتصفح"""
@@ -380,51 +928,37 @@ class VehicleHistoryScraper:
         try:
             # الذهاب لصفحة تسجيل الدخول
             await page.goto(CARFAX_LOGIN_URL, wait_until="networkidle")
-            await asyncio.sleep(2)
             
+            # Locator.fill/click تنتظر جاهزية العنصر - لا حاجة لانتظار ثابت بين الخطوات
+            # محدد واحد مدمج لكل حقل (round-trip واحد بدلاً من تجربة المحددات واحداً تلو الآخر)
             # ملء البريد الإلكتروني
-            email_selectors = ['input[name="username"]', 'input[type="email"]', '#username']
-            for selector in email_selectors:
-                try:
-                    elem = await page.query_selector(selector)
-                    if elem:
-                        await elem.fill(CARFAX_EMAIL)
-                        break
-                except:
-                    continue
-            
-            await asyncio.sleep(0.5)
+            try:
+                await page.locator(_LOGIN_SELECTORS["email_input"]).first.fill(CARFAX_EMAIL, timeout=10000)
+            except:
+                pass
             
             # ملء كلمة المرور
-            pass_selectors = ['input[name="password"]', 'input[type="password"]', '#password']
-            for selector in pass_selectors:
-                try:
-                    elem = await page.query_selector(selector)
-                    if elem:
-                        await elem.fill(CARFAX_PASSWORD)
-                        break
-                except:
-                    continue
-            
-            await asyncio.sleep(0.5)
+            try:
+                await page.locator(_LOGIN_SELECTORS["password_input"]).first.fill(CARFAX_PASSWORD, timeout=5000)
+            except:
+                pass
             
             # النقر على زر الإرسال
-            submit_selectors = ['button[type="submit"]', 'button[name="action"]']
-            for selector in submit_selectors:
-                try:
-                    elem = await page.query_selector(selector)
-                    if elem:
-                        await elem.click()
-                        break
-                except:
-                    continue
+            url_before = page.url
+            try:
+                await page.locator(_LOGIN_SELECTORS["submit_button"]).first.click(timeout=5000)
+            except:
+                pass
             
-            # انتظار التوجيه
-            await asyncio.sleep(5)
+            # انتظار التوجيه (تغيّر الـ URL ثم استقرار الصفحة) بدلاً من انتظار ثابت
+            try:
+                await page.wait_for_url(lambda url: url != url_before, timeout=15000)
+                await page.wait_for_load_state("networkidle", timeout=10000)
+            except:
+                pass
             
             # التحقق من نجاح التسجيل
-            html = await page.content()
-            if "logout" in html.lower() or "sign out" in html.lower():
+            if await page.evaluate(_LOGGED_IN_JS):
                 console.print("[green]  ✓ تم تسجيل الدخول[/green]")
                 return True
             
@@ -434,6 +968,53 @@ class VehicleHistoryScraper:
             console.print(f"[red]  ✗ خطأ في تسجيل الدخول: {e}[/red]")
             return False
     
+    def _read_cache(self, vin: str) -> Optional[VehicleReport]:
+        """
+        التقرير من الكاش إذا لم تنتهِ صلاحيته (TTL)
+        
+        التقرير المستخرج محفوظ في الملف الجانبي - الـ HTML يُحلل فقط للمدخلات القديمة
+        """
+        if CACHE_TTL <= 0:
+            return None
+        cache_path = CACHE_DIR / f"{vin}.html"
+        try:
+            if time.time() - cache_path.stat().st_mtime >= CACHE_TTL:
+                return None
+            try:
+                data = orjson.loads(cache_path.with_suffix(".json").read_bytes()).get("report")
+                if data:
+                    return VehicleReport(**data)
+            except (OSError, orjson.JSONDecodeError, TypeError, AttributeError):
+                pass
+            html = cache_path.read_text(encoding="utf-8")
+        except OSError:
+            return None
+        return self._extract_report_data(vin, html)
+    
+    def _write_cache(self, vin: str, html: str, report: VehicleReport) -> None:
+        """حفظ HTML في الكاش بشكل ذري (ملف مؤقت ثم replace) مع ملف جانبي فيه التقرير المستخرج"""
+        if CACHE_TTL <= 0:
+            return
+        try:
+            if not self._cache_dir_ready:
+                CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                self._cache_dir_ready = True
+            
+            cache_path = CACHE_DIR / f"{vin}.html"
+            tmp = cache_path.with_suffix(".html.tmp")
+            tmp.write_bytes(html.encode("utf-8"))
+            tmp.replace(cache_path)
+            
+            meta = {
+                "vin": vin,
+                "fetched_at": datetime.now().isoformat(timespec="seconds"),
+                "status": "ok",
+                "report": {**report.to_dict(), "raw_data": report.raw_data},
+            }
+            cache_path.with_suffix(".json").write_bytes(orjson.dumps(meta))
+        except OSError as e:
+            console.print(f"[yellow]  ⚠ تعذر حفظ الكاش: {e}[/yellow]")
+    
     def _validate_vin(self, vin: str) -> bool:
         """
         التحقق من صحة VIN
@@ -447,56 +1028,40 @@ class VehicleHistoryScraper:
         if not vin:
             return False
             
-        # VIN يجب أن يكون 17 حرفاً
+        # مطابقة واحدة: 17 حرفاً/رقماً بدون I, O, Q
         vin = vin.strip().upper()
+        if _VIN_RE.match(vin):
+            return True
+        
+        # تحديد سبب الرفض للرسالة فقط (المسار غير الشائع)
         if len(vin) != 17:
             console.print(f"[yellow]  ⚠ VIN يجب أن يكون 17 حرفاً: {vin}[/yellow]")
-            return False
-            
-        # لا يحتوي على I, O, Q
-        if any(c in vin for c in "IOQ"):
+        elif not _VIN_FORBIDDEN.isdisjoint(vin):
             console.print(f"[yellow]  ⚠ VIN لا يجب أن يحتوي I, O, Q: {vin}[/yellow]")
-            return False
-            
-        return True
+        else:
+            console.print(f"[yellow]  ⚠ VIN يجب أن يحتوي حروفاً وأرقاماً فقط: {vin}[/yellow]")
+        return False
     
-    def _is_login_required(self, html: str) -> bool:
+    def _is_login_required(self, html: str, html_lower: Optional[str] = None) -> bool:
         """
         التحقق إذا كانت الصفحة تطلب تسجيل الدخول
         
         Args:
             html: محتوى الصفحة
+            html_lower: html.lower() محسوبة مسبقاً (اختياري)
             
         Returns:
             True إذا كان التسجيل مطلوباً
         """
-        html_lower = html.lower()
+        # مؤشرات حالة الدخول في بداية الصفحة (head/الترويسة) - لا حاجة لنسخة lowercase كاملة
+        head = html_lower[:_LOGIN_PROBE_CHARS] if html_lower is not None else html[:_LOGIN_PROBE_CHARS].lower()
         
-        # التحقق من عنوان الصفحة - هذا هو المؤشر الأفضل
-        if "dealer account sign in" in html_lower:
+        # عنوان الصفحة أو صفحة الهبوط landing page
+        if any(indicator in head for indicator in _LOGIN_PAGE_INDICATORS):
             return True
         
-        # التحقق من وجود رابط Sign In (وليس زر Logout)
-        if 'href="/login"' in html_lower and "logout" not in html_lower:
-            return True
-            
-        # إذا كانت صفحة الهبوط landing page
-        if "landingpage" in html_lower or "get the most info now" in html_lower:
-            return True
-        
-        # إذا وجدنا مؤشرات الجلسة النشطة
-        logged_in_indicators = [
-            "sign out",  
-            "logout button",
-            "run vin",
-            "vehicle history"
-        ]
-        
-        for indicator in logged_in_indicators:
-            if indicator in html_lower:
-                return False
-                
-        return False
+        # رابط Sign In (وليس زر Logout)
+        return head.find('href="/login"') != -1 and head.find("logout") == -1
     
     def _extract_report_data(self, vin: str, html: str) -> VehicleReport:
         """
@@ -511,18 +1076,22 @@ class VehicleHistoryScraper:
         """
         report = VehicleReport(vin=vin)
         
+        # نسخة lowercase واحدة لكل دوال الاستخراج
+        html_lower = html.lower()
+        
         # التحقق من الأخطاء
-        if "unexpected error has occurred" in html.lower():
+        if "unexpected error has occurred" in html_lower:
             report.error = "خطأ في الموقع - VIN قد يكون غير صالح"
             console.print(f"[red]  ✗ خطأ من الموقع - تحقق من VIN[/red]")
             return report
         
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            # شجرة واحدة، وتصنيف العناصر مرة واحدة (بدلاً من مرور كامل لكل دالة)
+            elements = _parse_elements(html)
             
             # استخراج السنة/الشركة/الموديل من عنوان التقرير
             # مثال: "2008 BMW 3 SERIES 328XI"
-            ymm = self._extract_year_make_model(html, soup)
+            ymm = self._extract_year_make_model(html, elements)
             if ymm:
                 report.year = ymm.get("year")
                 report.make = ymm.get("make")
@@ -530,22 +1099,22 @@ class VehicleHistoryScraper:
                 report.trim = ymm.get("trim")
             
             # استخراج عدد الملاك
-            report.owners = self._extract_owners(html, soup)
+            report.owners = self._extract_owners(html, elements, html_lower)
             
             # استخراج الحوادث
-            report.accidents = self._extract_accidents(html, soup)
+            report.accidents = self._extract_accidents(html, elements, html_lower)
             
             # استخراج سجلات الخدمة
-            report.service_records = self._extract_service_records(html, soup)
+            report.service_records = self._extract_service_records(html, html_lower)
             
             # استخراج المسافة (Last reported odometer reading)
-            report.mileage = self._extract_mileage(html, soup)
+            report.mileage = self._extract_mileage(html, elements, html_lower)
             
             # استخراج حالة العنوان
-            report.title_status = self._extract_title_status(html, soup)
+            report.title_status = self._extract_title_status(html, html_lower)
             
             # استخراج بيانات إضافية من التقرير
-            report.raw_data = self._extract_additional_data(html, soup)
+            report.raw_data = self._extract_additional_data(html, html_lower)
             
             if report.year or report.make or report.model:
                 vehicle_info = f"{report.year or '?'} {report.make or '?'} {report.model or '?'}"
@@ -571,68 +1140,49 @@ class VehicleHistoryScraper:
             
         return report
     
-    def _extract_additional_data(self, html: str, soup: BeautifulSoup) -> dict:
+    def _extract_additional_data(
+        self, html: str, html_lower: Optional[str] = None
+    ) -> dict:
         """استخراج بيانات إضافية من التقرير"""
         data = {}
         
         # استخراج CARFAX Retail Value
-        value_match = re.search(r'\$[\d,]+(?:\.\d{2})?\s*(?:CARFAX\s*Retail\s*Value)?', html)
+        value_match = _RETAIL_VALUE_RE.search(html)
         if value_match:
-            data['retail_value'] = value_match.group(0).strip()
-        
-        # استخراج نوع المركبة (SEDAN, SUV, etc.)
-        vehicle_types = ['SEDAN', 'SUV', 'COUPE', 'TRUCK', 'VAN', 'WAGON', 'CONVERTIBLE', 'HATCHBACK']
-        for vtype in vehicle_types:
-            if vtype in html.upper():
-                data['vehicle_type'] = vtype
-                break
-        
-        # استخراج نوع الوقود
-        fuel_types = ['GASOLINE', 'DIESEL', 'ELECTRIC', 'HYBRID', 'FLEX FUEL']
-        for ftype in fuel_types:
-            if ftype in html.upper():
-                data['fuel_type'] = ftype
-                break
-        
-        # استخراج نظام الدفع
-        drive_types = ['ALL WHEEL DRIVE', 'FRONT WHEEL DRIVE', 'REAR WHEEL DRIVE', '4WD', 'AWD', 'FWD', 'RWD']
-        for dtype in drive_types:
-            if dtype in html.upper():
-                data['drive_type'] = dtype
-                break
+            data['retail_value'] = value_match.group(1)
+        
+        # نفس النسخة الـ lowercase المستخدمة في باقي الاستخراج (بدلاً من نسخة upper إضافية)
+        if html_lower is None:
+            html_lower = html.lower()
+        
+        # نوع المركبة / الوقود / الدفع - أول كلمة موجودة حسب ترتيب الأولوية
+        for key, terms in _ADDITIONAL_TERMS:
+            for term_lower, term in terms:
+                if term_lower in html_lower:
+                    data[key] = term
+                    break
         
         # استخراج الولاية الأخيرة
-        state_match = re.search(r'Last owned in\s+([A-Za-z\s]+)', html)
+        state_match = _LAST_STATE_RE.search(html)
         if state_match:
             data['last_state'] = state_match.group(1).strip()
         
         return data
     
-    def _extract_year_make_model(self, html: str, soup: BeautifulSoup) -> Optional[dict]:
+    def _extract_year_make_model(self, html: str, elements: Dict[str, list]) -> Optional[dict]:
         """استخراج السنة/الشركة/الموديل"""
         
-        # قائمة الشركات المعروفة للتحقق
-        known_makes = [
-            'Honda', 'Toyota', 'Ford', 'Chevrolet', 'Chevy', 'BMW', 'Mercedes', 
-            'Audi', 'Volkswagen', 'VW', 'Nissan', 'Hyundai', 'Kia', 'Mazda',
-            'Subaru', 'Lexus', 'Acura', 'Infiniti', 'Jeep', 'Dodge', 'Ram',
-            'Chrysler', 'GMC', 'Cadillac', 'Buick', 'Lincoln', 'Volvo', 'Porsche',
-            'Tesla', 'Mitsubishi', 'Suzuki', 'Fiat', 'Alfa', 'Jaguar', 'Land',
-            'Range', 'Mini', 'Smart', 'Scion', 'Saturn', 'Pontiac', 'Oldsmobile',
-            'Mercury', 'Hummer', 'Saab', 'Isuzu', 'Daewoo', 'Genesis', 'Polestar'
-        ]
-        known_makes_lower = [m.lower() for m in known_makes]
-        
         # البحث في العناصر المحددة
-        title_elements = soup.select('.vehicle-title, .vehicle-header, [class*="year-make-model"], .vhr-title, .report-title')
-        
-        for elem in title_elements:
-            text = elem.get_text(strip=True)
-            match = re.match(r'(\d{4})\s+([A-Za-z]+)\s+(.+)', text)
+        for elem in elements["title"]:
+            # كل الأنماط تبدأ بالسنة - عنصر بلا أرقام لا داعي لتجميع نصه
+            if not _has_digit(elem):
+                continue
+            text = _elem_text(elem, strip=True)
+            match = _YMM_RE.match(text)
             if match:
                 make = match.group(2)
                 # تحقق أن الشركة معروفة
-                if make.lower() in known_makes_lower:
+                if make.lower() in _KNOWN_MAKES_BY_LOWER:
                     return {
                         "year": match.group(1),
                         "make": make,
@@ -640,23 +1190,22 @@ class VehicleHistoryScraper:
                         "trim": " ".join(match.group(3).split()[1:]) if len(match.group(3).split()) > 1 else None
                     }
         
-        # البحث بنمط أكثر تحديداً - السنة + شركة معروفة
-        for make in known_makes:
-            pattern = rf'(\d{{4}})\s+{make}\s+([A-Za-z0-9]+(?:\s+[A-Za-z0-9]+)?)'
-            match = re.search(pattern, html, re.IGNORECASE)
-            if match:
-                return {
-                    "year": match.group(1),
-                    "make": make,
-                    "model": match.group(2).split()[0] if match.group(2) else None,
-                    "trim": " ".join(match.group(2).split()[1:]) if len(match.group(2).split()) > 1 else None
-                }
+        # البحث بنمط أكثر تحديداً - السنة + شركة معروفة (أول ظهور في الصفحة)
+        match = _MAKE_ALT_RE.search(html)
+        if match:
+            return {
+                "year": match.group(1),
+                "make": _KNOWN_MAKES_BY_LOWER[match.group(2).lower()],
+                "model": match.group(3).split()[0] if match.group(3) else None,
+                "trim": " ".join(match.group(3).split()[1:]) if len(match.group(3).split()) > 1 else None
+            }
         
         # البحث عن سنة فقط في عناصر التقرير
-        year_elements = soup.select('[class*="year"], [class*="vehicle"]')
-        for elem in year_elements:
-            text = elem.get_text(strip=True)
-            match = re.search(r'\b(19[89]\d|20[0-2]\d)\b', text)
+        for elem in elements["year"]:
+            if not _has_digit(elem):
+                continue
+            text = _elem_text(elem, strip=True)
+            match = _YEAR_RE.search(text)
             if match:
                 year = match.group(1)
                 # تحقق أنها سنة منطقية للمركبة (1980-2025)
@@ -665,109 +1214,94 @@ class VehicleHistoryScraper:
                     
         return None
     
-    def _extract_owners(self, html: str, soup: BeautifulSoup) -> Optional[int]:
+    def _extract_owners(
+        self, html: str, elements: Dict[str, list], html_lower: Optional[str] = None
+    ) -> Optional[int]:
         """استخراج عدد الملاك"""
+        # فحص نصي سريع قبل سلسلة الـ regex (صفحات الخطأ/الفارغة)
+        if "owner" not in (html_lower if html_lower is not None else html.lower()):
+            return None
+        
         # أنماط محددة من تقرير CARFAX
-        patterns = [
-            r'(\d+)\s*Previous\s*owners?',  # "2 Previous owners"
-            r'(\d+)\s*owner',  # "2 owner"
-            r'owner[s]?["\s:>]+(\d+)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, html, re.IGNORECASE)
-            if match:
-                try:
-                    return int(match.group(1))
-                except ValueError:
-                    pass
+        for value in _first_groups(_OWNERS_RES, html):
+            return int(value)
         
         # البحث في العناصر
-        owner_elements = soup.select('[class*="owner"], .ownership-history')
-        for elem in owner_elements:
-            text = elem.get_text()
-            match = re.search(r'(\d+)\s*(?:Previous\s*)?owner', text, re.IGNORECASE)
+        for elem in elements["owner"]:
+            if not _has_digit(elem):
+                continue
+            text = _elem_text(elem)
+            match = _OWNER_ELEMENT_RE.search(text)
             if match:
                 return int(match.group(1))
                     
         return None
     
-    def _extract_accidents(self, html: str, soup: BeautifulSoup) -> Optional[int]:
+    def _extract_accidents(
+        self, html: str, elements: Dict[str, list], html_lower: Optional[str] = None
+    ) -> Optional[int]:
         """استخراج عدد الحوادث"""
+        # فحص نصي سريع - كل الأنماط والعناصر تحتوي "accident"
+        if "accident" not in (html_lower if html_lower is not None else html.lower()):
+            return None
+        
         # البحث عن "No accidents" أولاً
-        if re.search(r'no\s*accident', html, re.IGNORECASE):
+        if _NO_ACCIDENT_RE.search(html):
             return 0
         
         # البحث في العناصر
-        accident_elements = soup.select('[class*="accident"]')
-        for elem in accident_elements:
-            text = elem.get_text()
+        for elem in elements["accident"]:
+            text = _elem_text(elem)
             if 'no accident' in text.lower():
                 return 0
-            match = re.search(r'(\d+)\s*accident', text, re.IGNORECASE)
+            match = _ACCIDENT_ELEMENT_RE.search(text)
             if match:
                 return int(match.group(1))
-            
-        patterns = [
-            r'(\d+)\s*accident',
-            r'accident[s]?["\s:>]+(\d+)',
-        ]
         
-        for pattern in patterns:
-            match = re.search(pattern, html, re.IGNORECASE)
-            if match:
-                try:
-                    return int(match.group(1))
-                except ValueError:
-                    pass
+        for value in _first_groups(_ACCIDENT_RES, html):
+            return int(value)
                     
         return None
     
-    def _extract_service_records(self, html: str, soup: BeautifulSoup) -> Optional[int]:
+    def _extract_service_records(
+        self, html: str, html_lower: Optional[str] = None
+    ) -> Optional[int]:
         """استخراج عدد سجلات الخدمة"""
-        patterns = [
-            r'(\d+)\s*Service\s*history\s*records?',  # "38 Service history records"
-            r'(\d+)\s*service\s*records?',
-            r'service.*?(\d+)\s*records?',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, html, re.IGNORECASE)
-            if match:
-                try:
-                    return int(match.group(1))
-                except ValueError:
-                    pass
+        # فحص نصي سريع - كل الأنماط تحتوي "service"
+        if "service" not in (html_lower if html_lower is not None else html.lower()):
+            return None
+        
+        for value in _first_groups(_SERVICE_RES, html):
+            return int(value)
                     
         return None
     
-    def _extract_mileage(self, html: str, soup: BeautifulSoup) -> Optional[str]:
+    def _extract_mileage(
+        self, html: str, elements: Dict[str, list], html_lower: Optional[str] = None
+    ) -> Optional[str]:
         """استخراج قراءة عداد المسافات"""
+        # فحص نصي سريع - "mi" يغطي miles/mi/mileage
+        if html_lower is None:
+            html_lower = html.lower()
+        if "odometer" not in html_lower and "mi" not in html_lower:
+            return None
+        
         # أنماط محددة من تقرير CARFAX
-        patterns = [
-            r'([\d,]+)\s*Last\s*reported\s*odometer\s*reading',  # "108,487 Last reported odometer reading"
-            r'Last\s*reported\s*odometer\s*reading[:\s]*([\d,]+)',
-            r'odometer[:\s]*([\d,]+)',
-            r'([\d,]+)\s*(?:miles|mi)\b',
-            r'mileage[:\s]*([\d,]+)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, html, re.IGNORECASE)
-            if match:
-                mileage = match.group(1).replace(',', '')
-                # تحقق أن الرقم منطقي (أكثر من 100 وأقل من مليون)
-                try:
-                    if 100 < int(mileage) < 1000000:
-                        return match.group(1)  # إرجاع مع الفواصل
-                except:
-                    pass
+        for value in _first_groups(_MILEAGE_RES, html):
+            mileage = value.replace(',', '')
+            # تحقق أن الرقم منطقي (أكثر من 100 وأقل من مليون)
+            try:
+                if 100 < int(mileage) < 1000000:
+                    return value  # إرجاع مع الفواصل
+            except:
+                pass
         
         # البحث في العناصر
-        mileage_elements = soup.select('[class*="mileage"], [class*="odometer"]')
-        for elem in mileage_elements:
-            text = elem.get_text()
-            match = re.search(r'([\d,]+)', text)
+        for elem in elements["mileage"]:
+            if not _has_digit(elem):
+                continue
+            text = _elem_text(elem)
+            match = _NUMBER_RE.search(text)
             if match:
                 mileage = match.group(1).replace(',', '')
                 try:
@@ -778,20 +1312,14 @@ class VehicleHistoryScraper:
                     
         return None
     
-    def _extract_title_status(self, html: str, soup: BeautifulSoup) -> Optional[str]:
+    def _extract_title_status(
+        self, html: str, html_lower: Optional[str] = None
+    ) -> Optional[str]:
         """استخراج حالة العنوان"""
-        statuses = [
-            ("clean title", "Clean"),
-            ("salvage", "Salvage"),
-            ("rebuilt", "Rebuilt"),
-            ("flood", "Flood"),
-            ("lemon", "Lemon"),
-            ("junk", "Junk"),
-        ]
+        if html_lower is None:
+            html_lower = html.lower()
         
-        html_lower = html.lower()
-        
-        for pattern, status in statuses:
+        for pattern, status in _TITLE_STATUSES:
             if pattern in html_lower:
                 return status
                 
@@ -805,6 +1333,8 @@ async def scrape_single_vin(
     """
     دالة مساعدة لسحب تقرير مركبة واحدة
     
+    داخل warm_session يُعاد استخدام متصفح الجلسة، وإلا يُطلق ويُغلق لهذا الاستدعاء فقط
+    
     Args:
         vin: رقم VIN
         cookie_manager: مدير الـ cookies
@@ -812,13 +1342,40 @@ async def scrape_single_vin(
     Returns:
         تقرير المركبة
     """
-    scraper = VehicleHistoryScraper(cookie_manager)
-    return await scraper.get_report(vin)
+    scraper = _SESSION.get()
+    if scraper is not None and scraper.cookie_manager is cookie_manager:
+        return await scraper.get_report(vin)
+    
+    async with VehicleHistoryScraper(cookie_manager) as scraper:
+        return await scraper.get_report(vin)
+
+
+# Scraper الجلسة الحالية لـ scrape_single_vin (None خارج warm_session)
+_SESSION: ContextVar[Optional[VehicleHistoryScraper]] = ContextVar("vehicle_history_session", default=None)
+
+
+@asynccontextmanager
+async def warm_session(cookie_manager: CookieManager) -> AsyncIterator[VehicleHistoryScraper]:
+    """
+    جلسة متصفح صريحة: استدعاءات scrape_single_vin داخلها تعيد استخدام نفس المتصفح
+    
+    مثال:
+        async with warm_session(cm):
+            for vin in vins:
+                report = await scrape_single_vin(vin, cm)
+    """
+    async with VehicleHistoryScraper(cookie_manager) as scraper:
+        token = _SESSION.set(scraper)
+        try:
+            yield scraper
+        finally:
+            _SESSION.reset(token)
 
 
 async def scrape_multiple_vins(
     vins: list[str],
-    cookie_manager: CookieManager
+    cookie_manager: CookieManager,
+    concurrency: int = 8
 ) -> list[VehicleReport]:
     """
     دالة مساعدة لسحب تقارير متعددة
@@ -826,14 +1383,11 @@ async def scrape_multiple_vins(
     Args:
         vins: قائمة أرقام VIN
         cookie_manager: مدير الـ cookies
+        concurrency: عدد الـ VINs التي تُسحب في نفس الوقت
         
     Returns:
-        قائمة التقارير
+        قائمة التقارير (غير الصالحة أولاً ثم بترتيب القائمة)
     """
+    # get_reports_batch يفتح المتصفح ويغلقه بنفسه (فشل الإطلاق = تقرير خطأ لكل VIN)
     scraper = VehicleHistoryScraper(cookie_manager)
-    reports = []
-    
-    async for report in scraper.get_reports(vins):
-        reports.append(report)
-        
-    return reports
+    return await scraper.get_reports_batch(vins, concurrency=concurrency)